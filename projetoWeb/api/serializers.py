@@ -1,5 +1,8 @@
 from rest_framework import serializers
 from eventos.models import Evento, Inscricao
+from eventos.reservas import reservar_vaga, ReservaIndisponivel
+from eventos.presencas import TAMANHO_MAXIMO_SINCRONIZACAO
+from certificados.validacao import TAMANHO_MAXIMO_VALIDACAO
 from usuarios.models import Usuario
 
 
@@ -51,7 +54,7 @@ class EventoDetailSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
     def get_total_inscritos(self, obj):
-        return obj.inscricoes.filter(status='CONFIRMADA').count()
+        return obj.inscritos_confirmados
 
 
 class InscricaoSerializer(serializers.ModelSerializer):
@@ -62,8 +65,8 @@ class InscricaoSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Inscricao
-        fields = ['id', 'evento', 'evento_id', 'usuario_nome', 'data_inscricao', 'status']
-        read_only_fields = ['id', 'usuario_nome', 'data_inscricao', 'status']
+        fields = ['id', 'evento', 'evento_id', 'usuario_nome', 'data_inscricao', 'status', 'token_checkin']
+        read_only_fields = ['id', 'usuario_nome', 'data_inscricao', 'status', 'token_checkin']
 
     def validate_evento_id(self, value):
         """Valida se o evento existe"""
@@ -108,10 +111,32 @@ class InscricaoSerializer(serializers.ModelSerializer):
         evento_id = validated_data.pop('evento_id')
         evento = Evento.objects.get(id=evento_id)
 
-        inscricao = Inscricao.objects.create(
-            usuario=request.user,
-            evento=evento,
-            status='CONFIRMADA'
-        )
+        # A checagem de vagas em validate() é apenas antecipada; a reserva
+        # atômica é quem garante que o evento não ultrapasse o limite
+        try:
+            inscricao, _ = reservar_vaga(request.user, evento)
+        except ReservaIndisponivel as e:
+            raise serializers.ValidationError(e.mensagem)
 
         return inscricao
+
+
+class AlteracaoPresencaSerializer(serializers.Serializer):
+    """Presença marcada offline para uma inscrição"""
+    inscricao_id = serializers.IntegerField()
+    presenca = serializers.BooleanField()
+    versao = serializers.IntegerField(min_value=0, help_text='Versão vista na lista baixada')
+
+
+class SincronizacaoCheckinSerializer(serializers.Serializer):
+    """Lote de presenças marcadas offline"""
+    alteracoes = AlteracaoPresencaSerializer(many=True, max_length=TAMANHO_MAXIMO_SINCRONIZACAO)
+
+
+class ValidacaoCertificadosSerializer(serializers.Serializer):
+    """Lote de códigos de validação de certificados"""
+    codigos = serializers.ListField(
+        child=serializers.CharField(max_length=64),
+        allow_empty=False,
+        max_length=TAMANHO_MAXIMO_VALIDACAO
+    )
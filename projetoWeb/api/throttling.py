@@ -11,3 +11,15 @@ class EventosInscricaoThrottle(UserRateThrottle):
     """Throttle para inscrição em eventos: 50 requisições por dia"""
     rate = '50/day'
     scope = 'eventos_inscricao'
+
+
+class CheckinThrottle(UserRateThrottle):
+    """Throttle para o check-in offline: 600 requisições por hora"""
+    rate = '600/hour'
+    scope = 'checkin'
+
+
+class ValidacaoCertificadosThrottle(UserRateThrottle):
+    """Throttle para a validação de certificados em lote: 120 requisições por hora (por usuário ou IP)"""
+    rate = '120/hour'
+    scope = 'validacao_certificados'
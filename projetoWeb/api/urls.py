@@ -2,7 +2,8 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     EventoViewSet, InscricaoViewSet,
-    CustomAuthToken, meus_dados, minhas_inscricoes
+    CustomAuthToken, meus_dados, minhas_inscricoes,
+    checkin_lista, checkin_sincronizar, validar_certificados
 )
 
 app_name = 'api'
@@ -19,6 +20,13 @@ urlpatterns = [
     path('me/', meus_dados, name='meus_dados'),
     path('me/inscricoes/', minhas_inscricoes, name='minhas_inscricoes'),
 
+    # Check-in offline
+    path('checkin/<int:evento_id>/', checkin_lista, name='checkin_lista'),
+    path('checkin/<int:evento_id>/sincronizar/', checkin_sincronizar, name='checkin_sincronizar'),
+
+    # Validação de certificados em lote (pública)
+    path('certificados/validar/', validar_certificados, name='validar_certificados'),
+
     # Router URLs
     path('', include(router.urls)),
 ]
@@ -1,19 +1,30 @@
 from rest_framework import viewsets, status
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
 from django.contrib.auth import authenticate
-from django.db.models import Q
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
 from eventos.models import Evento, Inscricao
+from eventos.reservas import liberar_vaga
+from eventos.busca import buscar
+from eventos.presencas import (
+    CAMPOS_LISTA_CHECKIN, lista_checkin, versao_lista_checkin, sincronizar_presencas
+)
+from certificados.validacao import validar_codigos
 from auditoria.models import LogAuditoria
 from .serializers import (
     EventoListSerializer, EventoDetailSerializer,
-    InscricaoSerializer, UsuarioSerializer
+    InscricaoSerializer, UsuarioSerializer, SincronizacaoCheckinSerializer,
+    ValidacaoCertificadosSerializer
+)
+from .throttling import (
+    EventosConsultaThrottle, EventosInscricaoThrottle, CheckinThrottle,
+    ValidacaoCertificadosThrottle
 )
-from .throttling import EventosConsultaThrottle, EventosInscricaoThrottle
 
 
 class CustomAuthToken(ObtainAuthToken):
@@ -52,7 +63,8 @@ class CustomAuthToken(ObtainAuthToken):
             usuario=user,
             acao='CONSULTA_API_EVENTOS',
             descricao=f'Usuário autenticou na API',
-            request=request
+            request=request,
+            imediato=True  # Autenticação não espera pela fila
         )
 
         return Response({
@@ -95,11 +107,8 @@ class EventoViewSet(viewsets.ReadOnlyModelViewSet):
             queryset = queryset.filter(data_inicio__gte=data_inicio)
 
         if search:
-            queryset = queryset.filter(
-                Q(titulo__icontains=search) |
-                Q(descricao__icontains=search) |
-                Q(local__icontains=search)
-            )
+            # Busca no índice textual, ordenada por relevância
+            return buscar(queryset, search)
 
         return queryset.order_by('data_inicio')
 
@@ -213,8 +222,8 @@ class InscricaoViewSet(viewsets.ModelViewSet):
             )
 
         # Atualiza o status ao invés de deletar
-        inscricao.status = 'CANCELADA'
-        inscricao.save()
+        # Cancela e promove o próximo da lista de espera na mesma transação
+        liberar_vaga(inscricao)
 
         # Registra log de auditoria
         LogAuditoria.registrar(
@@ -253,3 +262,114 @@ def minhas_inscricoes(request):
 
     serializer = InscricaoSerializer(inscricoes, many=True)
     return Response(serializer.data)
+
+
+def _evento_checkin(request, evento_id):
+    """Retorna o evento se o usuário pode fazer o check-in dele, ou None"""
+    evento = get_object_or_404(Evento, pk=evento_id)
+    if evento.organizador_id != request.user.id and not request.user.is_organizador():
+        return None
+    return evento
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([CheckinThrottle])
+def checkin_lista(request, evento_id):
+    """
+    Lista de participantes para o check-in offline
+
+    Cada participante vem como [inscricao_id, nome, token, presenca, versao].
+    A resposta traz um ETag com a versão da lista; com If-None-Match igual,
+    responde 304 sem reenviar os dados.
+    """
+    evento = _evento_checkin(request, evento_id)
+    if evento is None:
+        return Response(
+            {'erro': 'Apenas o organizador pode fazer o check-in deste evento'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    versao = versao_lista_checkin(evento)
+    etag = f'"{versao}"'
+    if request.headers.get('If-None-Match') == etag:
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+    participantes = lista_checkin(evento)
+
+    LogAuditoria.registrar(
+        usuario=request.user,
+        acao='CONSULTA_API_EVENTOS',
+        descricao=f'Baixou a lista de check-in do evento "{evento.titulo}" via API',
+        request=request,
+        dados_adicionais={
+            'evento_id': evento.id,
+            'versao': versao,
+            'total_participantes': len(participantes)
+        }
+    )
+
+    return Response(
+        {
+            'evento': {'id': evento.id, 'titulo': evento.titulo},
+            'versao': versao,
+            'gerado_em': timezone.now(),
+            'campos': CAMPOS_LISTA_CHECKIN,
+            'participantes': participantes
+        },
+        headers={'ETag': etag}
+    )
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([CheckinThrottle])
+def checkin_sincronizar(request, evento_id):
+    """
+    Aplica um lote de presenças marcadas offline
+
+    Corpo: {"alteracoes": [{"inscricao_id": 1, "presenca": true, "versao": 0}, ...]}.
+    Pode ser reenviado com segurança; conflitos voltam com o estado atual.
+    """
+    evento = _evento_checkin(request, evento_id)
+    if evento is None:
+        return Response(
+            {'erro': 'Apenas o organizador pode fazer o check-in deste evento'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    serializer = SincronizacaoCheckinSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    resultado = sincronizar_presencas(
+        evento,
+        request.user,
+        serializer.validated_data['alteracoes'],
+        request=request
+    )
+    resultado['versao'] = versao_lista_checkin(evento)
+
+    return Response(resultado)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+@throttle_classes([ValidacaoCertificadosThrottle])
+def validar_certificados(request):
+    """
+    Valida certificados em lote - público, para instituições parceiras
+
+    Corpo: {"codigos": ["550e8400-e29b-41d4-a716-446655440000", ...]}, até 300
+    códigos por chamada. Cada resultado traz a situação (valido, revogado,
+    nao_encontrado ou formato_invalido) e, se válido, participante e evento.
+    """
+    serializer = ValidacaoCertificadosSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    resultados = validar_codigos(serializer.validated_data['codigos'])
+
+    return Response({
+        'total': len(resultados),
+        'validos': sum(1 for resultado in resultados if resultado['valido']),
+        'resultados': resultados
+    })
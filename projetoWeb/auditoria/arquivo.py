@@ -0,0 +1,225 @@
+"""
+Arquivo morto dos logs de auditoria
+Logs mais antigos que a retenção saem da tabela log_auditoria e vão para
+arquivos JSONL compactados, um por dia (AUDITORIA_ARQUIVO_DIR/AAAA/MM/
+log_auditoria-AAAA-MM-DD.jsonl.gz). Cada dia é montado em um temporário: o que
+já estava arquivado e, depois, um membro gzip por lote lido. Quando o dia
+termina, o temporário troca o arquivo do dia com os.replace (uma vez por dia
+em cada execução) e só então os logs do dia são apagados do banco. Uma queda
+nunca deixa um membro pela metade; se o processo cair entre a troca e o
+DELETE, a próxima execução arquiva o dia de novo e a leitura descarta os ids
+repetidos.
+"""
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import zlib
+from datetime import datetime, time, timedelta
+from pathlib import Path
+from django.conf import settings
+from django.db.models import Q
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from .models import LogAuditoria
+
+TAMANHO_LOTE = 1000
+
+
+class ArquivoCorrompido(Exception):
+    """Erro levantado quando o arquivo de um dia não pode ser lido por inteiro"""
+
+    def __init__(self, caminho):
+        super().__init__(f'O arquivo de auditoria "{caminho}" está corrompido.')
+        self.caminho = caminho
+
+
+def diretorio():
+    return Path(getattr(settings, 'AUDITORIA_ARQUIVO_DIR', settings.BASE_DIR / 'projetoWeb' / 'arquivo_auditoria'))
+
+
+def caminho_dia(dia):
+    return diretorio() / f'{dia:%Y}' / f'{dia:%m}' / f'log_auditoria-{dia:%Y-%m-%d}.jsonl.gz'
+
+
+def _serializar(log):
+    return {
+        'id': log.id,
+        'usuario_id': log.usuario_id,
+        'acao': log.acao,
+        'descricao': log.descricao,
+        'ip_address': log.ip_address,
+        'user_agent': log.user_agent,
+        'data_hora': log.data_hora.isoformat(),
+        'dados_adicionais': log.dados_adicionais,
+    }
+
+
+def _permissao_padrao():
+    """Permissão de um arquivo novo segundo a umask do processo (mkstemp cria com 0600)"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+class _DiaEmGravacao:
+    """
+    Temporário com o arquivo de um dia, que substitui o definitivo ao concluir
+
+    Ou o dia inteiro (o que já estava arquivado e os lotes novos) entra no
+    arquivo, ou o arquivo continua como estava.
+    """
+
+    def __init__(self, dia):
+        self.dia = dia
+        self.caminho = caminho_dia(dia)
+        self.ids = []
+
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        # Sobras de uma execução interrompida
+        for sobra in self.caminho.parent.glob(f'.{self.caminho.name}.*.tmp'):
+            sobra.unlink(missing_ok=True)
+
+        descritor, self.temporario = tempfile.mkstemp(
+            dir=self.caminho.parent, prefix=f'.{self.caminho.name}.', suffix='.tmp'
+        )
+        self.arquivo = os.fdopen(descritor, 'wb')
+        try:
+            os.fchmod(descritor, _permissao_padrao())
+            if self.caminho.exists():
+                with open(self.caminho, 'rb') as atual:
+                    shutil.copyfileobj(atual, self.arquivo)
+        except BaseException:
+            self.descartar()
+            raise
+
+    def acrescentar(self, logs):
+        linhas = ''.join(
+            json.dumps(_serializar(log), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n' for log in logs
+        )
+        self.arquivo.write(gzip.compress(linhas.encode('utf-8')))
+        self.ids.extend(log.id for log in logs)
+
+    def concluir(self):
+        """Força a gravação em disco e troca o arquivo do dia pelo temporário"""
+        self.arquivo.flush()
+        os.fsync(self.arquivo.fileno())
+        self.arquivo.close()
+        os.replace(self.temporario, self.caminho)
+
+        # Grava a troca de nomes no diretório
+        diretorio_dia = os.open(self.caminho.parent, os.O_RDONLY)
+        try:
+            os.fsync(diretorio_dia)
+        finally:
+            os.close(diretorio_dia)
+
+    def descartar(self):
+        self.arquivo.close()
+        if os.path.exists(self.temporario):
+            os.unlink(self.temporario)
+
+
+def limite_retencao(dias):
+    """Início (meia-noite local) do dia mais antigo que fica no banco"""
+    return timezone.make_aware(datetime.combine(timezone.localdate() - timedelta(days=dias), time.min))
+
+
+def _concluir_dia(gravacao, tamanho_lote):
+    """Publica o arquivo do dia e só então apaga do banco os logs gravados nele"""
+    gravacao.concluir()
+    for inicio in range(0, len(gravacao.ids), tamanho_lote):
+        LogAuditoria.objects.filter(id__in=gravacao.ids[inicio:inicio + tamanho_lote]).delete()
+    return len(gravacao.ids)
+
+
+def arquivar(antes_de, tamanho_lote=TAMANHO_LOTE, ao_concluir_dia=None):
+    """
+    Move para o arquivo morto os logs com data_hora anterior a `antes_de`
+
+    Lê em lotes, na ordem de data_hora, acrescentando cada lote ao temporário
+    do seu dia; ao passar para o dia seguinte, o dia anterior é publicado e
+    apagado do banco. ao_concluir_dia(dia, quantidade) é chamado a cada dia.
+    Retorna {'arquivados', 'dias'}.
+    """
+    pendentes = LogAuditoria.objects.filter(data_hora__lt=antes_de).order_by('data_hora', 'id')
+
+    arquivados = 0
+    dias = []
+    gravacao = None
+    ultimo = None
+    try:
+        while True:
+            # Paginação por chave: os logs lidos só saem do banco quando o dia termina
+            lote = pendentes
+            if ultimo is not None:
+                lote = lote.filter(
+                    Q(data_hora__gt=ultimo.data_hora) | Q(data_hora=ultimo.data_hora, id__gt=ultimo.id)
+                )
+            lote = list(lote[:tamanho_lote])
+            if not lote:
+                break
+            ultimo = lote[-1]
+
+            por_dia = {}
+            for log in lote:
+                por_dia.setdefault(timezone.localtime(log.data_hora).date(), []).append(log)
+
+            for dia, logs in por_dia.items():
+                if gravacao is None or gravacao.dia != dia:
+                    if gravacao is not None:
+                        quantidade = _concluir_dia(gravacao, tamanho_lote)
+                        arquivados += quantidade
+                        if ao_concluir_dia:
+                            ao_concluir_dia(gravacao.dia, quantidade)
+                    gravacao = _DiaEmGravacao(dia)
+                    dias.append(dia)
+                gravacao.acrescentar(logs)
+
+        if gravacao is not None:
+            quantidade = _concluir_dia(gravacao, tamanho_lote)
+            arquivados += quantidade
+            if ao_concluir_dia:
+                ao_concluir_dia(gravacao.dia, quantidade)
+    except BaseException:
+        # O dia em andamento não é publicado e seus logs continuam no banco
+        if gravacao is not None:
+            gravacao.descartar()
+        raise
+
+    return {'arquivados': arquivados, 'dias': dias}
+
+
+def ler_dia(dia):
+    """
+    Logs arquivados de um dia, como instâncias (não salvas) de LogAuditoria
+
+    Retorna uma lista vazia se o dia não foi arquivado e levanta
+    ArquivoCorrompido se o arquivo não puder ser lido até o fim, em vez de
+    devolver só parte do dia.
+    """
+    from usuarios.models import Usuario
+
+    caminho = caminho_dia(dia)
+    if not caminho.exists():
+        return []
+
+    registros = {}
+    try:
+        with gzip.open(caminho, 'rt', encoding='utf-8') as arquivo:
+            for linha in arquivo:
+                registro = json.loads(linha)
+                registros[registro['id']] = registro
+    except (EOFError, gzip.BadGzipFile, zlib.error, ValueError) as erro:
+        # Só erros do conteúdo; os de acesso (permissão, arquivo sumido) seguem como OSError
+        raise ArquivoCorrompido(caminho) from erro
+
+    usuarios = Usuario.objects.in_bulk({r['usuario_id'] for r in registros.values() if r['usuario_id']})
+
+    logs = []
+    for registro in registros.values():
+        log = LogAuditoria(**{**registro, 'data_hora': datetime.fromisoformat(registro['data_hora'])})
+        log.usuario = usuarios.get(registro['usuario_id'])
+        logs.append(log)
+    return logs
@@ -0,0 +1,33 @@
+"""
+Filtros das listagens de auditoria
+Datas viram faixas semiabertas sobre data_hora (>= início do dia, < início do
+dia seguinte), em vez de data_hora__date: a coluna fica fora de funções e os
+índices (acao, data_hora), (usuario, data_hora) e (data_hora) podem ser usados.
+"""
+from datetime import datetime, time, timedelta
+from django.utils import timezone
+from .models import LogAuditoria
+
+
+def intervalo_dia(dia):
+    """Início e fim (exclusivo) do dia no fuso local, como datetimes com fuso"""
+    inicio = timezone.make_aware(datetime.combine(dia, time.min))
+    fim = timezone.make_aware(datetime.combine(dia + timedelta(days=1), time.min))
+    return inicio, fim
+
+
+def filtrar_logs(acao=None, usuario_id=None, data=None):
+    """Logs com os filtros de listar_logs, do mais recente para o mais antigo"""
+    logs = LogAuditoria.objects.all()
+
+    if acao:
+        logs = logs.filter(acao=acao)
+
+    if usuario_id:
+        logs = logs.filter(usuario_id=usuario_id)
+
+    if data:
+        inicio, fim = intervalo_dia(data)
+        logs = logs.filter(data_hora__gte=inicio, data_hora__lt=fim)
+
+    return logs
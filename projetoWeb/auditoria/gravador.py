@@ -0,0 +1,103 @@
+"""
+Gravação em lote dos logs de auditoria
+Logs de consulta entram em uma fila na memória do processo e uma thread os grava
+com bulk_create quando a fila chega a TAMANHO_LOTE ou a cada INTERVALO segundos;
+na saída do processo o que restar é gravado. Assim as leituras não disputam a
+trava de escrita do SQLite a cada requisição. Ações que alteram dados continuam
+gravadas na hora (ver LogAuditoria.registrar).
+"""
+import atexit
+import logging
+import threading
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE = 100
+INTERVALO = 2
+
+# Se o banco ficar indisponível, a fila não cresce além disto
+LIMITE_FILA = 10000
+
+
+class GravadorAuditoria:
+    """Fila de logs ainda não gravados e a thread que os grava"""
+
+    def __init__(self, tamanho_lote=TAMANHO_LOTE, intervalo=INTERVALO):
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self._fila = []
+        self._trava = threading.Lock()
+        self._sinal = threading.Event()
+        self._thread = None
+        self._encerrado = False
+
+    def adicionar(self, log):
+        """Enfileira um log (ainda não salvo); a gravação acontece em segundo plano"""
+        if self._encerrado:
+            log.save()
+            return
+
+        with self._trava:
+            if len(self._fila) >= LIMITE_FILA:
+                self._fila.pop(0)
+                logger.error('Fila de auditoria cheia; o log mais antigo foi descartado')
+            self._fila.append(log)
+            cheia = len(self._fila) >= self.tamanho_lote
+
+            # Iniciada sob demanda; também recria a thread em processos filhos (fork)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._executar, name='gravador-auditoria', daemon=True)
+                self._thread.start()
+
+        if cheia:
+            self._sinal.set()
+
+    def _executar(self):
+        while not self._encerrado:
+            self._sinal.wait(self.intervalo)
+            self._sinal.clear()
+            try:
+                self.descarregar()
+            except Exception:
+                logger.exception('Erro no gravador de auditoria')
+            finally:
+                # A thread tem a própria conexão com o banco; não a segura entre lotes
+                connection.close()
+
+    def descarregar(self):
+        """Grava agora tudo o que está na fila; retorna quantos logs foram gravados"""
+        from .models import LogAuditoria
+
+        with self._trava:
+            lote, self._fila = self._fila, []
+        if not lote:
+            return 0
+
+        try:
+            LogAuditoria.objects.bulk_create(lote)
+        except Exception:
+            # Devolve o lote para a próxima tentativa, na ordem original
+            logger.exception(f'Erro ao gravar {len(lote)} log(s) de auditoria; voltam para a fila')
+            with self._trava:
+                self._fila = (lote + self._fila)[-LIMITE_FILA:]
+            return 0
+        return len(lote)
+
+    def encerrar(self, timeout=10):
+        """Para a thread, esperando o lote em gravação, e grava o que sobrou"""
+        self._encerrado = True
+        self._sinal.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+        return self.descarregar()
+
+    def pendentes(self):
+        with self._trava:
+            return len(self._fila)
+
+
+gravador = GravadorAuditoria()
+
+# Garante que os logs enfileirados sejam gravados quando o processo termina
+atexit.register(gravador.encerrar)
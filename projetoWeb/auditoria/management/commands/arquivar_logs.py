@@ -0,0 +1,45 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from auditoria.arquivo import TAMANHO_LOTE, arquivar, diretorio, limite_retencao
+
+
+class Command(BaseCommand):
+    help = 'Move os logs de auditoria mais antigos que a retenção para arquivos .jsonl.gz diários'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias',
+            type=int,
+            default=getattr(settings, 'AUDITORIA_RETENCAO_DIAS', 90),
+            help='Dias mantidos no banco (padrão: AUDITORIA_RETENCAO_DIAS)'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANHO_LOTE,
+            help=f'Logs lidos por vez (padrão: {TAMANHO_LOTE}); cada dia é gravado e apagado do banco ao terminar'
+        )
+
+    def handle(self, *args, **options):
+        limite = limite_retencao(max(options['dias'], 0))
+        self.stdout.write(self.style.SUCCESS(
+            f'Arquivando logs anteriores a {limite:%d/%m/%Y} em {diretorio()}...'
+        ))
+
+        inicio = time.perf_counter()
+        resultado = arquivar(
+            limite,
+            tamanho_lote=max(options['lote'], 1),
+            ao_concluir_dia=lambda dia, quantidade: self.stdout.write(f'  → {dia:%d/%m/%Y}: {quantidade} log(s) arquivado(s)')
+        )
+        duracao = time.perf_counter() - inicio
+
+        if not resultado['arquivados']:
+            self.stdout.write(self.style.WARNING('  → Nenhum log para arquivar'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f'  ✓ {resultado["arquivados"]} log(s) de {len(resultado["dias"])} dia(s) '
+            f'arquivados em {duracao:.2f}s'
+        ))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-18 03:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auditoria", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="logauditoria",
+            name="acao",
+            field=models.CharField(
+                choices=[
+                    ("CRIAR_USUARIO", "Criação de Usuário"),
+                    ("CRIAR_EVENTO", "Criação de Evento"),
+                    ("ALTERAR_EVENTO", "Alteração de Evento"),
+                    ("EXCLUIR_EVENTO", "Exclusão de Evento"),
+                    ("CONSULTA_API_EVENTOS", "Consulta de Eventos via API"),
+                    ("INSCRICAO_EVENTO", "Inscrição em Evento"),
+                    ("GERAR_CERTIFICADO", "Geração de Certificado"),
+                    ("CONSULTAR_CERTIFICADO", "Consulta de Certificado"),
+                    ("REVOGAR_CERTIFICADO", "Revogação de Certificado"),
+                ],
+                max_length=50,
+            ),
+        ),
+    ]
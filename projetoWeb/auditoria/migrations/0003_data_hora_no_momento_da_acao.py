@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 03:37
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auditoria", "0002_acao_revogar_certificado"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="logauditoria",
+            name="data_hora",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-18 03:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auditoria", "0003_data_hora_no_momento_da_acao"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="logauditoria",
+            index=models.Index(fields=["data_hora"], name="log_data_hora_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="logauditoria",
+            index=models.Index(
+                fields=["acao", "data_hora"], name="log_acao_data_hora_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="logauditoria",
+            index=models.Index(
+                fields=["usuario", "data_hora"], name="log_usuario_data_hora_idx"
+            ),
+        ),
+    ]
@@ -1,4 +1,6 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
 Usuario = get_user_model()
@@ -13,8 +15,12 @@ class LogAuditoria(models.Model):
         ('INSCRICAO_EVENTO', 'Inscrição em Evento'),
         ('GERAR_CERTIFICADO', 'Geração de Certificado'),
         ('CONSULTAR_CERTIFICADO', 'Consulta de Certificado'),
+        ('REVOGAR_CERTIFICADO', 'Revogação de Certificado'),
     ]
 
+    # Ações de leitura: gravadas em lote, em segundo plano
+    ACOES_EM_LOTE = {'CONSULTA_API_EVENTOS', 'CONSULTAR_CERTIFICADO'}
+
     usuario = models.ForeignKey(
         Usuario,
         on_delete=models.SET_NULL,
@@ -25,7 +31,8 @@ class LogAuditoria(models.Model):
     descricao = models.TextField()
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.CharField(max_length=255, blank=True)
-    data_hora = models.DateTimeField(auto_now_add=True)
+    # Momento da ação, definido ao montar o log (não na gravação, que pode ser em lote)
+    data_hora = models.DateTimeField(default=timezone.now, editable=False)
     dados_adicionais = models.JSONField(null=True, blank=True)
 
     class Meta:
@@ -33,14 +40,22 @@ class LogAuditoria(models.Model):
         verbose_name = 'Log de Auditoria'
         verbose_name_plural = 'Logs de Auditoria'
         ordering = ['-data_hora']
+        indexes = [
+            # Listagem sem filtro e por data (faixa em data_hora, ver consultas.py)
+            models.Index(fields=['data_hora'], name='log_data_hora_idx'),
+            # Filtro por ação, com ou sem data
+            models.Index(fields=['acao', 'data_hora'], name='log_acao_data_hora_idx'),
+            # Logs de um usuário, com ou sem data
+            models.Index(fields=['usuario', 'data_hora'], name='log_usuario_data_hora_idx'),
+        ]
 
     def __str__(self):
         usuario_nome = self.usuario.username if self.usuario else 'Sistema'
         return f"{self.get_acao_display()} - {usuario_nome} - {self.data_hora.strftime('%d/%m/%Y %H:%M')}"
 
     @staticmethod
-    def registrar(usuario, acao, descricao, request=None, dados_adicionais=None):
-        """Método auxiliar para registrar logs de auditoria"""
+    def montar(usuario, acao, descricao, request=None, dados_adicionais=None):
+        """Cria o log sem salvar, para gravação em lote com bulk_create"""
         log = LogAuditoria(
             usuario=usuario,
             acao=acao,
@@ -52,7 +67,27 @@ class LogAuditoria(models.Model):
             log.ip_address = LogAuditoria.get_client_ip(request)
             log.user_agent = request.META.get('HTTP_USER_AGENT', '')
 
-        log.save()
+        return log
+
+    @staticmethod
+    def registrar(usuario, acao, descricao, request=None, dados_adicionais=None, imediato=False):
+        """
+        Método auxiliar para registrar logs de auditoria
+
+        Consultas (ACOES_EM_LOTE) vão para a fila do gravador e são gravadas em
+        lote, fora da requisição; as demais ações, ou com imediato=True (ex.:
+        autenticação), são gravadas na hora.
+        """
+        log = LogAuditoria.montar(usuario, acao, descricao, request, dados_adicionais)
+        if (
+            not imediato
+            and acao in LogAuditoria.ACOES_EM_LOTE
+            and getattr(settings, 'AUDITORIA_GRAVACAO_EM_LOTE', True)
+        ):
+            from .gravador import gravador
+            gravador.adicionar(log)
+        else:
+            log.save()
         return log
 
     @staticmethod
@@ -0,0 +1,140 @@
+import os
+import tempfile
+from datetime import timedelta
+from itertools import product
+from pathlib import Path
+from unittest import mock, skipUnless
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from auditoria.arquivo import ArquivoCorrompido, arquivar, caminho_dia, ler_dia, limite_retencao
+from auditoria.consultas import filtrar_logs
+from auditoria.models import LogAuditoria
+
+
+@skipUnless(connection.vendor == 'sqlite', 'O plano verificado é o formato do EXPLAIN QUERY PLAN do SQLite')
+class FiltrosLogsIndicesTests(TestCase):
+    """Toda combinação de filtros de listar_logs é resolvida por um índice"""
+
+    def test_plano_usa_indice(self):
+        hoje = timezone.localdate()
+        for acao, usuario_id, data in product(('GERAR_CERTIFICADO', None), (1, None), (hoje, None)):
+            with self.subTest(acao=acao, usuario_id=usuario_id, data=data):
+                # A página de 50 que a view busca
+                plano = filtrar_logs(acao=acao, usuario_id=usuario_id, data=data)[:50].explain()
+                self.assertRegex(plano, r'USING (COVERING )?INDEX')
+                if data:
+                    # A faixa do dia limita a busca no índice (com data_hora__date o SQLite varre o índice todo)
+                    self.assertIn('data_hora>? AND data_hora<?', plano)
+
+
+class ArquivoMortoTests(TestCase):
+    """Arquivamento diário dos logs: lotes inteiros ou nada, e corrupção nunca passa despercebida"""
+
+    def setUp(self):
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        configuracao = override_settings(AUDITORIA_ARQUIVO_DIR=Path(diretorio.name))
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+        self.limite = limite_retencao(0)
+        self.momento = self.limite - timedelta(hours=12)
+        self.dia = timezone.localtime(self.momento).date()
+
+    def criar_logs(self, quantidade, momento=None):
+        LogAuditoria.objects.bulk_create([
+            LogAuditoria(acao='CRIAR_EVENTO', descricao=f'Log {i}', data_hora=momento or self.momento)
+            for i in range(quantidade)
+        ])
+
+    def test_lotes_acrescentados_ao_mesmo_dia(self):
+        self.criar_logs(5)
+        resultado = arquivar(self.limite, tamanho_lote=2)
+
+        self.assertEqual(resultado['arquivados'], 5)
+        self.assertEqual(resultado['dias'], [self.dia])
+        self.assertFalse(LogAuditoria.objects.exists())
+        self.assertEqual(len(ler_dia(self.dia)), 5)
+
+    def test_um_arquivo_publicado_por_dia(self):
+        anterior = self.momento - timedelta(days=1)
+        self.criar_logs(7, anterior)
+        self.criar_logs(5)
+
+        with mock.patch('auditoria.arquivo.os.replace', wraps=os.replace) as replace:
+            resultado = arquivar(self.limite, tamanho_lote=2)
+
+        dia_anterior = timezone.localtime(anterior).date()
+        self.assertEqual(replace.call_count, 2)
+        self.assertEqual(resultado['dias'], [dia_anterior, self.dia])
+        self.assertEqual(len(ler_dia(dia_anterior)), 7)
+        self.assertEqual(len(ler_dia(self.dia)), 5)
+
+    def test_arquivo_segue_a_umask(self):
+        self.criar_logs(1)
+        arquivar(self.limite)
+
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(caminho_dia(self.dia).stat().st_mode & 0o777, 0o666 & ~umask)
+
+    def test_falha_no_segundo_dia_mantem_o_primeiro_publicado(self):
+        anterior = self.momento - timedelta(days=1)
+        self.criar_logs(3, anterior)
+        self.criar_logs(2)
+
+        publicacoes = []
+
+        def replace(origem, destino):
+            if publicacoes:
+                raise OSError('disco cheio')
+            publicacoes.append(destino)
+            os.rename(origem, destino)
+
+        with mock.patch('auditoria.arquivo.os.replace', side_effect=replace):
+            with self.assertRaises(OSError):
+                arquivar(self.limite, tamanho_lote=2)
+
+        # O primeiro dia saiu do banco; o segundo continua lá e não tem arquivo
+        self.assertEqual(len(ler_dia(timezone.localtime(anterior).date())), 3)
+        self.assertEqual(LogAuditoria.objects.count(), 2)
+        self.assertFalse(caminho_dia(self.dia).exists())
+
+    def test_falha_na_gravacao_preserva_o_arquivo_e_o_banco(self):
+        self.criar_logs(2)
+        arquivar(self.limite)
+        conteudo = caminho_dia(self.dia).read_bytes()
+
+        self.criar_logs(2)
+        with mock.patch('auditoria.arquivo.os.replace', side_effect=OSError('disco cheio')):
+            with self.assertRaises(OSError):
+                arquivar(self.limite)
+
+        # O arquivo do dia ficou intacto, sem temporários, e o lote continua no banco
+        self.assertEqual(caminho_dia(self.dia).read_bytes(), conteudo)
+        self.assertEqual(list(caminho_dia(self.dia).parent.iterdir()), [caminho_dia(self.dia)])
+        self.assertEqual(LogAuditoria.objects.count(), 2)
+
+        arquivar(self.limite)
+        self.assertEqual(len(ler_dia(self.dia)), 4)
+
+    def test_arquivo_truncado_e_reportado(self):
+        self.criar_logs(2)
+        arquivar(self.limite, tamanho_lote=1)
+        caminho = caminho_dia(self.dia)
+        caminho.write_bytes(caminho.read_bytes()[:-10])
+
+        with self.assertRaises(ArquivoCorrompido):
+            ler_dia(self.dia)
+
+    def test_erro_de_acesso_nao_vira_corrompido(self):
+        self.criar_logs(1)
+        arquivar(self.limite)
+
+        with mock.patch('auditoria.arquivo.gzip.open', side_effect=PermissionError('sem permissão')):
+            with self.assertRaises(PermissionError):
+                ler_dia(self.dia)
+
+    def test_dia_nao_arquivado(self):
+        self.assertEqual(ler_dia(self.dia), [])
@@ -1,9 +1,15 @@
+import logging
 from django.shortcuts import render
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
 from django.http import JsonResponse
 from datetime import datetime
 from .models import LogAuditoria
+from .arquivo import ArquivoCorrompido, ler_dia
+from .consultas import filtrar_logs
+
+logger = logging.getLogger(__name__)
 
 @login_required
 def listar_logs(request):
@@ -11,25 +17,21 @@ def listar_logs(request):
     if not request.user.is_organizador():
         return JsonResponse({'erro': 'Acesso negado'}, status=403)
 
-    logs = LogAuditoria.objects.all()
-
     # Filtros
-    acao = request.GET.get('acao')
-    if acao:
-        logs = logs.filter(acao=acao)
-
-    usuario_id = request.GET.get('usuario')
-    if usuario_id:
-        logs = logs.filter(usuario_id=usuario_id)
-
+    data_obj = None
     data = request.GET.get('data')
     if data:
         try:
             data_obj = datetime.strptime(data, '%Y-%m-%d').date()
-            logs = logs.filter(data_hora__date=data_obj)
         except ValueError:
             pass
 
+    logs = filtrar_logs(
+        acao=request.GET.get('acao'),
+        usuario_id=request.GET.get('usuario'),
+        data=data_obj
+    )
+
     # Paginação
     paginator = Paginator(logs, 50)
     page_number = request.GET.get('page')
@@ -62,13 +64,23 @@ def logs_usuario(request, usuario_id):
 
 @login_required
 def logs_data(request, data):
-    """Lista logs de uma data específica"""
+    """Lista logs de uma data específica, inclusive de dias já arquivados"""
     if not request.user.is_organizador():
         return JsonResponse({'erro': 'Acesso negado'}, status=403)
 
     try:
         data_obj = datetime.strptime(data, '%Y-%m-%d').date()
-        logs = LogAuditoria.objects.filter(data_hora__date=data_obj)
+        logs = filtrar_logs(data=data_obj).select_related('usuario')
+
+        # Dias anteriores à retenção estão no arquivo morto (ver arquivar_logs)
+        try:
+            arquivados = ler_dia(data_obj)
+        except ArquivoCorrompido as e:
+            logger.exception(str(e))
+            messages.error(request, 'O arquivo morto deste dia está corrompido; apenas os logs do banco são exibidos.')
+            arquivados = []
+        if arquivados:
+            logs = sorted(arquivados + list(logs), key=lambda log: log.data_hora, reverse=True)
 
         paginator = Paginator(logs, 50)
         page_number = request.GET.get('page')
@@ -76,7 +88,8 @@ def logs_data(request, data):
 
         context = {
             'page_obj': page_obj,
-            'data': data,
+            'data': data_obj,
+            'arquivado': bool(arquivados),
         }
 
         return render(request, 'auditoria/logs_data.html', context)
@@ -0,0 +1,69 @@
+"""
+Pacotes de certificados para download
+O ZIP é montado sob demanda e enviado em pedaços: cada PDF é escrito no
+arquivo assim que fica pronto e os bytes saem logo em seguida, então a memória
+usada não cresce com o número de certificados.
+"""
+import zipfile
+from .pdf import obter_pdf
+
+TAMANHO_BLOCO = 64 * 1024
+
+
+class _Fluxo:
+    """Destino somente-escrita do ZipFile; guarda os bytes até serem enviados"""
+
+    def __init__(self):
+        self._partes = []
+        self._posicao = 0
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        self._posicao += len(dados)
+        return len(dados)
+
+    def tell(self):
+        return self._posicao
+
+    def flush(self):
+        pass
+
+    def esvaziar(self):
+        dados = b''.join(self._partes)
+        self._partes = []
+        return dados
+
+
+def nome_no_zip(certificado):
+    inscricao = certificado.inscricao
+    nome = inscricao.usuario.get_full_name() or inscricao.usuario.username
+    nome = ''.join(c if c.isalnum() else '_' for c in nome).strip('_')
+    return f'certificado_{inscricao.id}_{nome}.pdf'
+
+
+def zip_certificados(certificados):
+    """
+    Gera os bytes de um ZIP com o PDF de cada certificado
+
+    Usa o PDF armazenado quando ele está atualizado e gera (e guarda) os que
+    faltarem. `certificados` deve trazer inscricao__usuario e
+    inscricao__evento via select_related.
+    """
+    fluxo = _Fluxo()
+    # O fluxo não aceita seek: o zipfile grava os tamanhos depois de cada arquivo
+    with zipfile.ZipFile(fluxo, mode='w', compression=zipfile.ZIP_DEFLATED) as pacote:
+        for certificado in certificados:
+            arquivo = obter_pdf(certificado)
+            with arquivo.open('rb') as origem, pacote.open(nome_no_zip(certificado), mode='w') as destino:
+                while True:
+                    bloco = origem.read(TAMANHO_BLOCO)
+                    if not bloco:
+                        break
+                    destino.write(bloco)
+                    dados = fluxo.esvaziar()
+                    if dados:
+                        yield dados
+            yield fluxo.esvaziar()
+
+    # Diretório central, escrito ao fechar o arquivo
+    yield fluxo.esvaziar()
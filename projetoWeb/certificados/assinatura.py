@@ -0,0 +1,115 @@
+"""
+Códigos assinados dos certificados
+Cada certificado leva um token curto, assinado com HMAC (SECRET_KEY), com o id
+do certificado, o evento, a data de emissão e um hash do nome do participante.
+O token vai no QR code do PDF; a verificação confere a assinatura sem consultar
+o banco, só olhando a lista de revogados, que fica em memória.
+"""
+import hashlib
+from datetime import datetime
+from django.core.cache import cache
+from django.core.signing import BadSignature, Signer
+from django.utils import timezone
+
+SALT = 'certificados.token'
+
+# Lista de revogados em cache; uma revogação vale em todos os processos em até 5 minutos
+CHAVE_REVOGADOS = 'certificados_revogados'
+VALIDADE_REVOGADOS = 300
+
+
+def _assinador():
+    return Signer(salt=SALT)
+
+
+def hash_nome(nome):
+    """Hash curto do nome, sem diferenciar maiúsculas nem espaços extras"""
+    normalizado = ' '.join(nome.split()).casefold()
+    return hashlib.sha256(normalizado.encode('utf-8')).hexdigest()[:12]
+
+
+def gerar_token(certificado):
+    inscricao = certificado.inscricao
+    conteudo = '-'.join([
+        str(certificado.id),
+        str(inscricao.evento_id),
+        certificado.data_emissao.strftime('%Y%m%d'),
+        hash_nome(inscricao.usuario.get_full_name()),
+    ])
+    return _assinador().sign(conteudo)
+
+
+def ler_token(token):
+    """Confere a assinatura e retorna os dados do token, ou None se for inválido"""
+    try:
+        conteudo = _assinador().unsign(token.strip())
+        certificado_id, evento_id, data_emissao, nome = conteudo.split('-')
+        return {
+            'certificado_id': int(certificado_id),
+            'evento_id': int(evento_id),
+            'data_emissao': datetime.strptime(data_emissao, '%Y%m%d').date(),
+            'hash_nome': nome,
+        }
+    except (BadSignature, ValueError):
+        return None
+
+
+def certificados_revogados():
+    """Ids dos certificados revogados, lidos do banco no máximo a cada 5 minutos"""
+    from .models import Certificado
+
+    return cache.get_or_set(
+        CHAVE_REVOGADOS,
+        lambda: frozenset(
+            Certificado.objects.filter(revogado_em__isnull=False).values_list('id', flat=True)
+        ),
+        VALIDADE_REVOGADOS
+    )
+
+
+def verificar_token(token, nome=None):
+    """
+    Verifica um token sem consultar o banco (fora a lista de revogados)
+
+    Retorna {'valido', 'revogado', 'dados', 'nome_confere'}; nome_confere é
+    None quando nenhum nome é informado para comparação.
+    """
+    dados = ler_token(token)
+    if dados is None:
+        return {'valido': False, 'revogado': False, 'dados': None, 'nome_confere': None}
+
+    revogado = dados['certificado_id'] in certificados_revogados()
+    nome_confere = None
+    if nome:
+        nome_confere = hash_nome(nome) == dados['hash_nome']
+
+    return {'valido': not revogado, 'revogado': revogado, 'dados': dados, 'nome_confere': nome_confere}
+
+
+def revogar_certificado(certificado, usuario=None, motivo=''):
+    """Revoga o certificado e descarta a lista em cache; retorna False se já estava revogado"""
+    from auditoria.models import LogAuditoria
+    from .models import Certificado
+    from .validacao import chave_cache
+
+    agora = timezone.now()
+    revogados = Certificado.objects.filter(
+        pk=certificado.pk, revogado_em__isnull=True
+    ).update(revogado_em=agora)
+    if not revogados:
+        return False
+
+    certificado.revogado_em = agora
+    cache.delete_many([CHAVE_REVOGADOS, chave_cache(str(certificado.codigo_validacao))])
+
+    LogAuditoria.registrar(
+        usuario=usuario,
+        acao='REVOGAR_CERTIFICADO',
+        descricao=f'Certificado revogado - {certificado.inscricao}',
+        dados_adicionais={
+            'certificado_id': certificado.id,
+            'codigo_validacao': str(certificado.codigo_validacao),
+            'motivo': motivo,
+        }
+    )
+    return True
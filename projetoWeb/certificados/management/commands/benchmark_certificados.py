@@ -0,0 +1,111 @@
+from io import BytesIO
+import os
+import tempfile
+import time
+import uuid
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from certificados.modelo import ModeloCertificado
+from certificados.pdf import renderizar_pdf, renderizar_pdf_impressao
+
+
+class Command(BaseCommand):
+    help = 'Compara o custo por certificado de cada forma de gerar os PDFs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--quantidade',
+            type=int,
+            default=500,
+            help='Número de certificados gerados em cada medição (padrão: 500)'
+        )
+        parser.add_argument(
+            '--fundo',
+            help='Arte de fundo para medir o modelo (padrão: uma imagem gerada para o teste)'
+        )
+        parser.add_argument(
+            '--logo',
+            help='Logo para medir o modelo (padrão: uma imagem gerada para o teste)'
+        )
+
+    def dados_ficticios(self, quantidade):
+        return [
+            {
+                'nome': f'Participante de Teste {i}',
+                'titulo': 'Semana Acadêmica de Computação',
+                'data_inicio': '01/03/2025',
+                'data_fim': '05/03/2025',
+                'local': 'Auditório Central',
+                'codigo_validacao': str(uuid.uuid4()),
+                'data_emissao': '06/03/2025',
+                # Mesmo tamanho de um link real: o QR code de verificação entra na medição
+                'url_verificacao': f'{settings.BASE_URL}/certificados/verificar/{i}-1-20250306-{uuid.uuid4().hex[:12]}:{"x" * 43}/',
+            }
+            for i in range(quantidade)
+        ]
+
+    def medir(self, descricao, quantidade, funcao):
+        inicio = time.perf_counter()
+        tamanho = funcao()
+        duracao = time.perf_counter() - inicio
+        self.stdout.write(
+            f'  → {descricao:<40} {duracao * 1000 / quantidade:7.3f} ms/certificado  '
+            f'({quantidade / duracao:7.1f}/s, {tamanho / 1024:.0f} KiB)'
+        )
+        return duracao
+
+    def handle(self, *args, **options):
+        quantidade = options['quantidade']
+        lista_dados = self.dados_ficticios(quantidade)
+
+        self.stdout.write(self.style.SUCCESS(f'Gerando {quantidade} certificados em cada modo...'))
+
+        def um_arquivo_por_certificado():
+            return sum(len(renderizar_pdf(dados)) for dados in lista_dados)
+
+        def pdf_unico():
+            destino = BytesIO()
+            renderizar_pdf_impressao(lista_dados, destino)
+            return len(destino.getvalue())
+
+        por_arquivo = self.medir('Um PDF por certificado', quantidade, um_arquivo_por_certificado)
+        unico = self.medir('PDF único (form XObject)', quantidade, pdf_unico)
+
+        self.stdout.write(self.style.SUCCESS(f'\nPDF único: {por_arquivo / unico:.1f}x o desempenho de um PDF por certificado'))
+
+        self.medir_modelo(lista_dados, options.get('fundo'), options.get('logo'))
+
+    def medir_modelo(self, lista_dados, fundo, logo):
+        """Compara recompilar a arte a cada certificado com o modelo compilado uma vez"""
+        quantidade = len(lista_dados)
+        with tempfile.TemporaryDirectory() as pasta:
+            fundo = fundo or self.imagem_ficticia(os.path.join(pasta, 'fundo.png'), (2480, 3508))
+            logo = logo or self.imagem_ficticia(os.path.join(pasta, 'logo.png'), (600, 300))
+
+            self.stdout.write(self.style.SUCCESS('\nModelo com arte de fundo e logo (um PDF por certificado)...'))
+
+            def recompilando():
+                return sum(
+                    len(renderizar_pdf(dados, ModeloCertificado(fundo, logo, instituicao='Eventify')))
+                    for dados in lista_dados
+                )
+
+            modelo = ModeloCertificado(fundo, logo, instituicao='Eventify')
+
+            def em_cache():
+                return sum(len(renderizar_pdf(dados, modelo)) for dados in lista_dados)
+
+            sem_cache = self.medir('Modelo recompilado a cada certificado', quantidade, recompilando)
+            com_cache = self.medir('Modelo compilado uma vez', quantidade, em_cache)
+
+        self.stdout.write(self.style.SUCCESS(f'\nModelo em cache: {sem_cache / com_cache:.1f}x mais rápido por certificado'))
+
+    def imagem_ficticia(self, caminho, tamanho):
+        """Gera uma imagem com degradê para simular a arte institucional"""
+        from PIL import Image
+
+        largura, altura = tamanho
+        imagem = Image.linear_gradient('L').resize(tamanho).convert('RGB')
+        imagem.putpixel((largura // 2, altura // 2), (200, 30, 30))
+        imagem.save(caminho)
+        return caminho
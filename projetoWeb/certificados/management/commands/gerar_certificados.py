@@ -1,9 +1,15 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import time
 from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Q
 from django.utils import timezone
-from eventos.models import Evento, Inscricao
+from eventos.models import Evento
 from certificados.models import Certificado
-from auditoria.models import LogAuditoria
-from usuarios.email import enviar_email_certificado_disponivel
+from certificados.pdf import dados_certificado, pdf_atualizado, renderizar_pdf, armazenar_pdf
+from certificados.travas import travar, renovar, TravaOcupada
+from certificados.varredura import TRAVA_VARREDURA, DURACAO_TRAVA, TAMANHO_LOTE, gerar_certificados_evento
 
 
 class Command(BaseCommand):
@@ -15,20 +21,78 @@ class Command(BaseCommand):
             type=int,
             help='ID do evento específico para gerar certificados'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Processos para renderizar os PDFs (padrão: número de CPUs; 1 = sem paralelismo)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=16,
+            help='Certificados enviados de uma vez a cada processo (padrão: 16)'
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANHO_LOTE,
+            help=f'Inscrições gravadas por transação (padrão: {TAMANHO_LOTE})'
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=int,
+            help='Repete a varredura a cada N segundos, como processo de fundo (em vez do middleware)'
+        )
 
     def handle(self, *args, **kwargs):
         evento_id = kwargs.get('evento_id')
+        workers = max(kwargs.get('workers') or 1, 1)
+        chunk_size = max(kwargs.get('chunk_size') or 1, 1)
+        intervalo = kwargs.get('intervalo')
+        self.tamanho_lote = max(kwargs.get('lote') or 1, 1)
 
+        if not intervalo:
+            self.varrer(evento_id, workers, chunk_size)
+            return
+
+        self.stdout.write(self.style.SUCCESS(f'Varrendo a cada {intervalo}s (Ctrl+C para parar)'))
+        try:
+            while True:
+                inicio = time.perf_counter()
+                try:
+                    self.varrer(evento_id, workers, chunk_size)
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f'Erro na varredura: {e}'))
+                finally:
+                    # Não segura a conexão entre uma varredura e outra
+                    connections.close_all()
+                time.sleep(max(intervalo - (time.perf_counter() - inicio), 0))
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('\nVarredura interrompida'))
+
+    def varrer(self, evento_id, workers, chunk_size):
+        # A mesma trava da varredura automática: nunca dois processos ao mesmo tempo
+        try:
+            with travar(TRAVA_VARREDURA, DURACAO_TRAVA) as dono:
+                self.renovar_trava = lambda: renovar(TRAVA_VARREDURA, dono, DURACAO_TRAVA)
+                self.executar(evento_id, workers, chunk_size)
+        except TravaOcupada:
+            self.stdout.write(self.style.WARNING('Outra varredura de certificados está em andamento; nada a fazer'))
+
+    def executar(self, evento_id, workers, chunk_size):
+        inicio = time.perf_counter()
         self.stdout.write(self.style.SUCCESS('Iniciando geração de certificados...'))
 
         if evento_id:
             # Gera certificados para um evento específico
             try:
                 evento = Evento.objects.get(id=evento_id)
-                self.gerar_certificados_evento(evento)
+                total = self.gerar_certificados_evento(evento)
             except Evento.DoesNotExist:
                 self.stdout.write(self.style.ERROR(f'Evento com ID {evento_id} não encontrado'))
                 return
+            eventos = [evento]
         else:
             # Gera certificados para todos os eventos finalizados
             eventos_finalizados = Evento.objects.filter(
@@ -36,83 +100,108 @@ class Command(BaseCommand):
                 status='ABERTO'
             )
 
-            if not eventos_finalizados.exists():
+            eventos = list(eventos_finalizados)
+            if not eventos:
                 self.stdout.write(self.style.WARNING('Nenhum evento finalizado encontrado'))
-                return
 
-            for evento in eventos_finalizados:
-                self.gerar_certificados_evento(evento)
-
-        self.stdout.write(self.style.SUCCESS('Geração de certificados concluída!'))
-
-    def gerar_certificados_evento(self, evento):
-        """Gera certificados para todas as inscrições confirmadas de um evento"""
-        self.stdout.write(f'\nProcessando evento: {evento.titulo}')
-
-        # Busca inscrições confirmadas COM PRESENÇA sem certificado
-        inscricoes = Inscricao.objects.filter(
-            evento=evento,
-            status='CONFIRMADA',
-            presenca_confirmada=True,  # Apenas quem teve presença confirmada
-            certificado__isnull=True
-        ).select_related('usuario')
-
-        if not inscricoes.exists():
-            self.stdout.write(self.style.WARNING(f'  → Nenhuma inscrição sem certificado encontrada'))
+            total = 0
+            for evento in eventos:
+                total += self.gerar_certificados_evento(evento)
+                self.renovar_trava()
+
+        self.renovar_trava()
+        self.renderizar_pdfs(eventos, workers, chunk_size)
+
+        duracao = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'Geração de certificados concluída! {len(eventos)} evento(s), '
+            f'{total} certificado(s) em {duracao:.2f}s'
+        ))
+
+    def renderizar_pdfs(self, eventos, workers, chunk_size):
+        """
+        Renderiza os PDFs pendentes: certificados ainda sem arquivo e os dos
+        eventos processados cujo PDF ficou desatualizado (revogados nunca)
+
+        Os dados são lidos aqui e só o desenho do PDF (puro CPU, sem banco)
+        vai para o pool de processos; os arquivos são gravados por este
+        processo e os nomes atualizados com bulk_update.
+        """
+        self.stdout.write('\nRenderizando PDFs pendentes...')
+
+        certificados = Certificado.objects.filter(
+            Q(arquivo_pdf='') | Q(arquivo_pdf__isnull=True) | Q(inscricao__evento__in=eventos),
+            revogado_em__isnull=True
+        ).select_related('inscricao__usuario', 'inscricao__evento').order_by('id')
+
+        pendentes = []
+        for certificado in certificados.iterator(chunk_size=500):
+            dados = dados_certificado(certificado)
+            if not pdf_atualizado(certificado, dados):
+                pendentes.append((certificado, dados))
+
+        if not pendentes:
+            self.stdout.write(self.style.WARNING('  → Nenhum PDF pendente'))
             return
 
-        certificados_gerados = 0
+        inicio = time.perf_counter()
+        lista_dados = [dados for _, dados in pendentes]
 
-        for inscricao in inscricoes:
-            try:
-                # Cria o certificado
-                certificado = Certificado.objects.create(
-                    inscricao=inscricao
-                )
+        if workers > 1:
+            # Conexões herdadas pelo fork não podem ser usadas pelos filhos
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                renderizados = executor.map(renderizar_pdf, lista_dados, chunksize=chunk_size)
+                self.armazenar_pdfs(pendentes, renderizados)
+        else:
+            self.armazenar_pdfs(pendentes, map(renderizar_pdf, lista_dados))
+
+        duracao = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'  ✓ {len(pendentes)} PDF(s) em {duracao:.2f}s '
+            f'({len(pendentes) / duracao:.1f} PDFs/s, {workers} processo(s))'
+        ))
+
+    def armazenar_pdfs(self, pendentes, renderizados):
+        lote = []
+        for (certificado, dados), conteudo in zip(pendentes, renderizados):
+            armazenar_pdf(certificado, dados, conteudo, salvar=False)
+            lote.append(certificado)
+            if len(lote) >= 500:
+                Certificado.objects.bulk_update(lote, ['arquivo_pdf'])
+                lote = []
+        if lote:
+            Certificado.objects.bulk_update(lote, ['arquivo_pdf'])
 
-                # Registra log de auditoria
-                LogAuditoria.registrar(
-                    usuario=None,  # Sistema
-                    acao='GERAR_CERTIFICADO',
-                    descricao=f'Certificado gerado automaticamente para {inscricao.usuario.get_full_name()} - {evento.titulo}',
-                    dados_adicionais={
-                        'evento_id': evento.id,
-                        'evento_titulo': evento.titulo,
-                        'usuario_id': inscricao.usuario.id,
-                        'certificado_id': certificado.id,
-                        'codigo_validacao': str(certificado.codigo_validacao)
-                    }
-                )
+    def gerar_certificados_evento(self, evento):
+        """Gera certificados para todas as inscrições confirmadas de um evento, em lotes"""
+        self.stdout.write(f'\nProcessando evento: {evento.titulo}')
 
-                # Envia email notificando o usuário
-                enviar_email_certificado_disponivel(certificado)
+        def ao_concluir_lote(quantidade):
+            self.stdout.write(self.style.SUCCESS(f'  ✓ Lote de {quantidade} certificado(s) gerado(s)'))
+            self.renovar_trava()
 
-                certificados_gerados += 1
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f'  ✓ Certificado gerado para: {inscricao.usuario.get_full_name()}'
-                    )
-                )
+        certificados_gerados = gerar_certificados_evento(
+            evento,
+            tamanho_lote=self.tamanho_lote,
+            automatico=False,
+            ao_concluir_lote=ao_concluir_lote
+        )
 
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(
-                        f'  ✗ Erro ao gerar certificado para {inscricao.usuario.get_full_name()}: {e}'
-                    )
+        if not certificados_gerados:
+            self.stdout.write(self.style.WARNING(f'  → Nenhuma inscrição sem certificado encontrada'))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'\n  Total de certificados gerados: {certificados_gerados}'
                 )
-
-        self.stdout.write(
-            self.style.SUCCESS(
-                f'\n  Total de certificados gerados: {certificados_gerados}'
             )
-        )
 
-        # Atualiza o status do evento para FECHADO
-        if certificados_gerados > 0:
-            evento.status = 'FECHADO'
-            evento.save()
+        if evento.status == 'FECHADO':
             self.stdout.write(
                 self.style.SUCCESS(
                     f'  → Status do evento atualizado para FECHADO'
                 )
             )
+
+        return certificados_gerados
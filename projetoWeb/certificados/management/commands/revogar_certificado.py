@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from certificados.models import Certificado
+from certificados.assinatura import revogar_certificado
+
+
+class Command(BaseCommand):
+    help = 'Revoga um certificado: o QR code e o código de validação deixam de ser aceitos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('codigo', help='Código de validação (UUID) do certificado')
+        parser.add_argument('--motivo', default='', help='Motivo da revogação, registrado na auditoria')
+
+    def handle(self, *args, **options):
+        try:
+            certificado = Certificado.objects.select_related('inscricao__usuario', 'inscricao__evento').get(
+                codigo_validacao=options['codigo']
+            )
+        except (Certificado.DoesNotExist, ValueError):
+            self.stdout.write(self.style.ERROR(f'Certificado {options["codigo"]} não encontrado'))
+            return
+
+        if revogar_certificado(certificado, motivo=options['motivo']):
+            self.stdout.write(self.style.SUCCESS(f'✓ Certificado revogado: {certificado.inscricao}'))
+        else:
+            self.stdout.write(self.style.WARNING(f'  → O certificado já estava revogado'))
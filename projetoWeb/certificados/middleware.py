@@ -1,14 +1,13 @@
 """
 Middleware para geração automática de certificados
-Verifica eventos finalizados a cada requisição e gera certificados automaticamente
+Uma vez por hora (entre todos os workers) dispara, em segundo plano, a
+varredura que gera os certificados dos eventos finalizados; a requisição que
+dispara não espera por ela
 """
-from django.utils import timezone
+from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
 from django.core.cache import cache
-from eventos.models import Evento, Inscricao
-from certificados.models import Certificado
-from auditoria.models import LogAuditoria
-from usuarios.email import enviar_email_certificado_disponivel
+from .varredura import varrer_em_segundo_plano
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,84 +21,23 @@ class AutoCertificadoMiddleware(MiddlewareMixin):
 
     def process_request(self, request):
         """
-        Verifica a cada 1 hora (em cache) se há certificados para gerar
-        Isso evita overhead em cada requisição
+        A cada 5 minutos (em cache, por processo) tenta disparar a varredura
+        A trava de agenda no banco garante uma varredura por hora entre todos
+        os workers; isso evita overhead em cada requisição
         """
-        # Verifica se já rodou recentemente (cache de 1 hora)
+        # Desligado quando a varredura roda em um processo próprio (gerar_certificados --intervalo)
+        if not getattr(settings, 'CERTIFICADOS_VARREDURA_AUTOMATICA', True):
+            return None
+
+        # Verifica se este processo já tentou recentemente (cache de 5 minutos)
         cache_key = 'auto_certificado_check'
         if cache.get(cache_key):
             return None
 
-        # Define cache por 1 hora
-        cache.set(cache_key, True, 3600)
-
-        # Busca eventos finalizados que ainda estão abertos
-        eventos_finalizados = Evento.objects.filter(
-            data_fim__lt=timezone.now().date(),
-            status='ABERTO'
-        )
-
-        if not eventos_finalizados.exists():
-            return None
+        # Define cache por 5 minutos
+        cache.set(cache_key, True, 300)
 
-        # Gera certificados para cada evento
-        for evento in eventos_finalizados:
-            self._gerar_certificados_evento(evento)
+        if varrer_em_segundo_plano():
+            logger.info('Varredura de certificados iniciada em segundo plano')
 
         return None
-
-    def _gerar_certificados_evento(self, evento):
-        """Gera certificados para todas as inscrições confirmadas de um evento"""
-        try:
-            # Busca inscrições confirmadas COM PRESENÇA sem certificado
-            inscricoes = Inscricao.objects.filter(
-                evento=evento,
-                status='CONFIRMADA',
-                presenca_confirmada=True,  # Apenas quem teve presença confirmada
-                certificado__isnull=True
-            ).select_related('usuario')
-
-            if not inscricoes.exists():
-                return
-
-            certificados_gerados = 0
-
-            for inscricao in inscricoes:
-                try:
-                    # Cria o certificado
-                    certificado = Certificado.objects.create(
-                        inscricao=inscricao
-                    )
-
-                    # Registra log de auditoria
-                    LogAuditoria.registrar(
-                        usuario=None,  # Sistema
-                        acao='GERAR_CERTIFICADO',
-                        descricao=f'Certificado gerado automaticamente para {inscricao.usuario.get_full_name()} - {evento.titulo}',
-                        dados_adicionais={
-                            'evento_id': evento.id,
-                            'evento_titulo': evento.titulo,
-                            'usuario_id': inscricao.usuario.id,
-                            'certificado_id': certificado.id,
-                            'codigo_validacao': str(certificado.codigo_validacao),
-                            'automatico': True
-                        }
-                    )
-
-                    # Envia email notificando o usuário
-                    enviar_email_certificado_disponivel(certificado)
-
-                    certificados_gerados += 1
-                    logger.info(f'Certificado gerado automaticamente para {inscricao.usuario.get_full_name()} - Evento: {evento.titulo}')
-
-                except Exception as e:
-                    logger.error(f'Erro ao gerar certificado para {inscricao.usuario.get_full_name()}: {e}')
-
-            # Atualiza o status do evento para FECHADO
-            if certificados_gerados > 0:
-                evento.status = 'FECHADO'
-                evento.save()
-                logger.info(f'Evento "{evento.titulo}" fechado automaticamente após geração de {certificados_gerados} certificados')
-
-        except Exception as e:
-            logger.error(f'Erro ao processar evento {evento.titulo}: {e}')
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 03:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("certificados", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TravaExecucao",
+            fields=[
+                (
+                    "nome",
+                    models.CharField(max_length=100, primary_key=True, serialize=False),
+                ),
+                ("dono", models.CharField(max_length=200)),
+                ("adquirida_em", models.DateTimeField()),
+                ("expira_em", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "Trava de Execução",
+                "verbose_name_plural": "Travas de Execução",
+                "db_table": "trava_execucao",
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 03:31
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def marcar_existentes_como_notificados(apps, schema_editor):
+    # Certificados anteriores já tiveram o email enviado na emissão
+    Certificado = apps.get_model("certificados", "Certificado")
+    Certificado.objects.filter(notificado_em__isnull=True).update(
+        notificado_em=F("data_emissao")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("certificados", "0003_trava_execucao"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="certificado",
+            name="notificado_em",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(
+            marcar_existentes_como_notificados, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 03:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("certificados", "0004_certificado_notificado_em"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="certificado",
+            name="revogado_em",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
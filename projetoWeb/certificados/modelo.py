@@ -0,0 +1,127 @@
+"""
+Modelo (camada fixa) dos certificados
+Arte de fundo, logo, fonte e textos fixos são carregados e preparados uma vez
+por processo e reaproveitados em todos os certificados; cada certificado só
+carimba os campos variáveis por cima. Configurado em settings:
+CERTIFICADO_FUNDO, CERTIFICADO_LOGO, CERTIFICADO_FONTE e CERTIFICADO_INSTITUICAO.
+"""
+import hashlib
+import os
+from functools import lru_cache
+from io import BytesIO
+from django.conf import settings
+from reportlab import rl_config
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+# Resolução da arte de fundo depois de preparada (pontos → pixels)
+DPI_FUNDO = 150
+
+# Imagens em binário (FlateDecode/DCTDecode) em vez de ASCII85: o PDF sai menor e o
+# reportlab deixa de codificar cada imagem em Python puro a cada certificado
+rl_config.useA85 = 0
+
+FONTE_PADRAO = 'Helvetica'
+FONTE_PADRAO_NEGRITO = 'Helvetica-Bold'
+
+
+class ModeloCertificado:
+    """Recursos fixos já preparados para desenhar certificados"""
+
+    def __init__(self, fundo=None, logo=None, fonte=None, instituicao=''):
+        self.instituicao = instituicao or ''
+        self.fonte, self.fonte_titulo = self._registrar_fonte(fonte)
+        self.fundo = self._preparar_fundo(fundo)
+        self.logo = self._preparar_logo(logo)
+        self.versao = self._versao(fundo, logo, fonte, self.instituicao)
+
+    @staticmethod
+    def _registrar_fonte(caminho):
+        if not caminho:
+            return FONTE_PADRAO, FONTE_PADRAO_NEGRITO
+        nome = 'Certificado-' + os.path.splitext(os.path.basename(caminho))[0]
+        if nome not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(TTFont(nome, caminho))
+        return nome, nome
+
+    @staticmethod
+    def _preparar_fundo(caminho):
+        """
+        Reduz a arte à resolução de impressão e a converte uma vez para JPEG
+
+        O reportlab embute JPEG sem recomprimir, então cada certificado só
+        copia os bytes prontos; os pixels ficam decodificados no ImageReader.
+        """
+        if not caminho:
+            return None
+        from PIL import Image
+
+        largura, altura = A4
+        tamanho = (round(largura / 72 * DPI_FUNDO), round(altura / 72 * DPI_FUNDO))
+        with Image.open(caminho) as imagem:
+            imagem = imagem.convert('RGB').resize(tamanho)
+            buffer = BytesIO()
+            imagem.save(buffer, format='JPEG', quality=85)
+
+        fundo = ImageReader(BytesIO(buffer.getvalue()))
+        fundo.getRGBData()
+        return fundo
+
+    @staticmethod
+    def _preparar_logo(caminho):
+        if not caminho:
+            return None
+        logo = ImageReader(caminho)
+        # Decodifica agora; o ImageReader guarda os pixels para os próximos usos
+        logo.getRGBData()
+        return logo
+
+    @staticmethod
+    def _versao(*caminhos):
+        """Identifica a configuração e os arquivos; muda se a arte for trocada"""
+        partes = []
+        for caminho in caminhos:
+            if caminho and os.path.exists(caminho):
+                info = os.stat(caminho)
+                partes.append(f'{caminho}:{info.st_size}:{info.st_mtime_ns}')
+            else:
+                partes.append(str(caminho or ''))
+        return hashlib.sha256('|'.join(partes).encode('utf-8')).hexdigest()[:12]
+
+    def desenhar(self, p):
+        """Desenha a camada fixa no canvas (ou dentro de um form XObject)"""
+        width, height = A4
+
+        if self.fundo:
+            p.drawImage(self.fundo, 0, 0, width=width, height=height)
+
+        if self.logo:
+            largura_logo, altura_logo = self.logo.getSize()
+            altura = 60
+            largura = largura_logo * altura / altura_logo
+            p.drawImage(self.logo, (width - largura) / 2, height - 70 - altura / 2, width=largura, height=altura, mask='auto')
+
+        # Título
+        p.setFont(self.fonte_titulo, 24)
+        p.drawCentredString(width/2, height - 100 - (40 if self.logo else 0), "CERTIFICADO")
+
+        if self.instituicao:
+            p.setFont(self.fonte, 12)
+            p.drawCentredString(width/2, 130, self.instituicao)
+
+
+@lru_cache(maxsize=1)
+def _modelo(fundo, logo, fonte, instituicao):
+    return ModeloCertificado(fundo, logo, fonte, instituicao)
+
+
+def modelo_certificado():
+    """Modelo configurado em settings, compilado na primeira chamada de cada processo"""
+    return _modelo(
+        str(getattr(settings, 'CERTIFICADO_FUNDO', None) or '') or None,
+        str(getattr(settings, 'CERTIFICADO_LOGO', None) or '') or None,
+        str(getattr(settings, 'CERTIFICADO_FONTE', None) or '') or None,
+        getattr(settings, 'CERTIFICADO_INSTITUICAO', '')
+    )
@@ -7,6 +7,10 @@ class Certificado(models.Model):
     codigo_validacao = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     data_emissao = models.DateTimeField(auto_now_add=True)
     arquivo_pdf = models.FileField(upload_to='certificados/', null=True, blank=True)
+    # Preenchido quando o email de "certificado disponível" é entregue; nulo = pendente
+    notificado_em = models.DateTimeField(null=True, blank=True, editable=False)
+    # Certificado cancelado; o token assinado deixa de ser aceito na verificação
+    revogado_em = models.DateTimeField(null=True, blank=True, editable=False)
     
     class Meta:
         db_table = 'certificado'
@@ -15,3 +19,30 @@ class Certificado(models.Model):
     
     def __str__(self):
         return f"Certificado - {self.inscricao}"
+
+    @property
+    def token_verificacao(self):
+        """Código assinado impresso no QR code, verificável sem consultar o banco"""
+        from .assinatura import gerar_token
+        return gerar_token(self)
+
+
+class TravaExecucao(models.Model):
+    """
+    Trava com prazo de validade compartilhada entre processos
+
+    Garante que só um worker execute uma tarefa periódica por vez; se quem
+    segura a trava morrer, ela expira e outro processo pode assumir.
+    """
+    nome = models.CharField(max_length=100, primary_key=True)
+    dono = models.CharField(max_length=200)
+    adquirida_em = models.DateTimeField()
+    expira_em = models.DateTimeField()
+
+    class Meta:
+        db_table = 'trava_execucao'
+        verbose_name = 'Trava de Execução'
+        verbose_name_plural = 'Travas de Execução'
+
+    def __str__(self):
+        return f"{self.nome} - {self.dono} (até {self.expira_em:%d/%m/%Y %H:%M})"
@@ -0,0 +1,203 @@
+"""
+Geração e armazenamento dos PDFs de certificados
+O PDF é renderizado uma vez e guardado em Certificado.arquivo_pdf com um nome
+derivado do hash dos dados impressos; downloads seguintes leem o arquivo. Se o
+nome do participante ou o título, as datas ou o local do evento mudarem, o
+hash muda e o PDF é gerado de novo. Cada certificado traz um QR code com o
+link de verificação assinado (ver assinatura.py).
+"""
+import hashlib
+import json
+from itertools import groupby
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.urls import reverse
+from reportlab.graphics.barcode import qrencoder
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import A4
+from .modelo import modelo_certificado
+
+PASTA = 'certificados'
+TAMANHO_QR = 80
+MARGEM_QR = 4  # módulos brancos em volta do código
+MASCARA_QR = 0
+
+
+def dados_certificado(certificado):
+    """Tudo o que é impresso no certificado; qualquer mudança aqui gera um novo PDF"""
+    inscricao = certificado.inscricao
+    evento = inscricao.evento
+    return {
+        'nome': inscricao.usuario.get_full_name(),
+        'titulo': evento.titulo,
+        'data_inicio': evento.data_inicio.strftime('%d/%m/%Y'),
+        'data_fim': evento.data_fim.strftime('%d/%m/%Y'),
+        'local': evento.local,
+        'codigo_validacao': str(certificado.codigo_validacao),
+        'data_emissao': certificado.data_emissao.strftime('%d/%m/%Y'),
+        'url_verificacao': settings.BASE_URL + reverse('verificar_certificado', args=[certificado.token_verificacao]),
+    }
+
+
+def impressao_digital(dados):
+    # O modelo (arte, logo, fonte) também faz parte do que é impresso
+    conteudo = json.dumps({**dados, 'modelo': modelo_certificado().versao}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+
+def nome_arquivo(dados):
+    """Nome endereçado pelo conteúdo: o mesmo conjunto de dados gera sempre o mesmo nome"""
+    return f"{PASTA}/{dados['codigo_validacao']}-{impressao_digital(dados)[:16]}.pdf"
+
+
+def _desenhar_campos(p, dados, modelo):
+    """Parte variável: participante, evento e validação"""
+    width, height = A4
+    # Com logo, o texto desce para abrir espaço
+    if modelo.logo:
+        height -= 40
+
+    # Corpo do certificado
+    p.setFont(modelo.fonte, 14)
+    p.drawCentredString(width/2, height - 200, f"Certificamos que {dados['nome']}")
+    p.drawCentredString(width/2, height - 230, f"participou do evento '{dados['titulo']}'")
+    p.drawCentredString(width/2, height - 260, f"realizado de {dados['data_inicio']} a {dados['data_fim']}")
+    p.drawCentredString(width/2, height - 290, f"Local: {dados['local']}")
+
+    # Código de validação
+    p.setFont(modelo.fonte, 10)
+    p.drawCentredString(width/2, 100, f"Código de validação: {dados['codigo_validacao']}")
+
+    # Data de emissão
+    p.drawCentredString(width/2, 80, f"Emitido em: {dados['data_emissao']}")
+
+    # QR code com o link de verificação assinado
+    if dados.get('url_verificacao'):
+        _desenhar_qr(p, dados['url_verificacao'], width - 130, 50, TAMANHO_QR)
+
+
+def _desenhar_qr(p, conteudo, x, y, tamanho):
+    """
+    Desenha o QR code como um único caminho, uma faixa por sequência de módulos escuros
+
+    O QrCodeWidget monta um objeto gráfico por módulo e custa dezenas de
+    milissegundos por certificado. A máscara também é fixa: make() testa as 8
+    máscaras e pontua cada uma, o que custa ~9x a codificação; qualquer
+    máscara gera um código válido.
+    """
+    qr = qrencoder.QRCode(None, qrencoder.QRErrorCorrectLevel.M)
+    qr.addData(conteudo)
+    qr.version = qr.calculate_version()
+    qr.makeImpl(False, MASCARA_QR)
+
+    total = qr.getModuleCount() + 2 * MARGEM_QR
+    modulo = tamanho / total
+
+    # Fundo branco (zona de silêncio), para ler o código mesmo sobre a arte
+    p.saveState()
+    p.setFillColorRGB(1, 1, 1)
+    p.rect(x, y, tamanho, tamanho, stroke=0, fill=1)
+    p.setFillColorRGB(0, 0, 0)
+
+    caminho = p.beginPath()
+    for linha, modulos in enumerate(qr.modules):
+        topo = y + tamanho - (linha + MARGEM_QR + 1) * modulo
+        coluna = 0
+        for escuro, grupo in groupby(modulos, bool):
+            quantidade = len(list(grupo))
+            if escuro:
+                caminho.rect(x + (coluna + MARGEM_QR) * modulo, topo, quantidade * modulo, modulo)
+            coluna += quantidade
+    p.drawPath(caminho, stroke=0, fill=1)
+    p.restoreState()
+
+
+def renderizar_pdf(dados, modelo=None):
+    """Desenha o certificado e retorna os bytes do PDF (por padrão com o modelo em cache)"""
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4)
+    modelo = modelo or modelo_certificado()
+
+    modelo.desenhar(p)
+    _desenhar_campos(p, dados, modelo)
+
+    # Finaliza o PDF
+    p.showPage()
+    p.save()
+
+    return buffer.getvalue()
+
+
+def renderizar_pdf_impressao(lista_dados, destino):
+    """
+    Desenha vários certificados como páginas de um único PDF, em `destino`
+
+    A camada fixa do modelo é desenhada uma vez como form XObject e reutilizada em cada
+    página, que só acrescenta os campos variáveis. O ganho é de tamanho: o tempo por
+    página fica quase igual ao de um PDF por certificado, dominado pelo QR code de
+    cada página. Retorna o número de páginas.
+    """
+    p = canvas.Canvas(destino, pagesize=A4)
+    modelo = modelo_certificado()
+
+    p.beginForm('layout_certificado')
+    modelo.desenhar(p)
+    p.endForm()
+
+    paginas = 0
+    for dados in lista_dados:
+        p.doForm('layout_certificado')
+        _desenhar_campos(p, dados, modelo)
+        p.showPage()
+        paginas += 1
+
+    p.save()
+    return paginas
+
+
+def pdf_atualizado(certificado, dados):
+    """Indica se arquivo_pdf já corresponde aos dados informados"""
+    nome = nome_arquivo(dados)
+    arquivo = certificado.arquivo_pdf
+    return arquivo.name == nome and arquivo.storage.exists(nome)
+
+
+def armazenar_pdf(certificado, dados, conteudo, salvar=True):
+    """
+    Grava o PDF renderizado e aponta arquivo_pdf para ele
+
+    O arquivo anterior, se houver, é apagado. Com salvar=False o banco não é
+    atualizado (para quem grava vários certificados com bulk_update).
+    """
+    from .models import Certificado
+
+    nome = nome_arquivo(dados)
+    armazenamento = certificado.arquivo_pdf.storage
+    antigo = certificado.arquivo_pdf.name
+
+    if not armazenamento.exists(nome):
+        # save() pode trocar o nome se houver colisão; o nome final é o retornado
+        nome = armazenamento.save(nome, ContentFile(conteudo))
+
+    if salvar:
+        Certificado.objects.filter(pk=certificado.pk).update(arquivo_pdf=nome)
+    certificado.arquivo_pdf = nome
+
+    if antigo and antigo != nome and armazenamento.exists(antigo):
+        armazenamento.delete(antigo)
+
+    return certificado.arquivo_pdf
+
+
+def obter_pdf(certificado):
+    """
+    Garante que arquivo_pdf corresponde aos dados atuais e o retorna
+
+    Só renderiza quando o arquivo ainda não existe ou os dados mudaram; nesse
+    caso o arquivo antigo é apagado.
+    """
+    dados = dados_certificado(certificado)
+    if pdf_atualizado(certificado, dados):
+        return certificado.arquivo_pdf
+    return armazenar_pdf(certificado, dados, renderizar_pdf(dados))
@@ -0,0 +1,102 @@
+import io
+import tempfile
+import zipfile
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from certificados.arquivos import nome_no_zip
+from certificados.management.commands.gerar_certificados import Command as GerarCertificados
+from certificados.models import Certificado
+from certificados.travas import adquirir
+from certificados.varredura import INTERVALO_VARREDURA, TRAVA_AGENDA, TRAVA_VARREDURA, varrer_em_segundo_plano
+from eventos.models import Inscricao
+from eventos.tests import criar_aluno, criar_evento, criar_organizador
+
+
+# Logs de consulta gravados na hora: a fila do gravador só seria descarregada
+# na saída do processo, quando o banco de teste já não existe
+@override_settings(CERTIFICADOS_VARREDURA_AUTOMATICA=False, AUDITORIA_GRAVACAO_EM_LOTE=False)
+class CertificadoRevogadoTests(TestCase):
+    """Um certificado revogado não sai mais em nenhum download nem é renderizado de novo"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizador = criar_organizador()
+        cls.evento = criar_evento(cls.organizador)
+        cls.valido, cls.revogado = [
+            Certificado.objects.create(
+                inscricao=Inscricao.objects.create(
+                    usuario=criar_aluno(f'aluno{i}', first_name='Aluno', last_name=str(i)),
+                    evento=cls.evento,
+                    status='CONFIRMADA'
+                )
+            )
+            for i in range(2)
+        ]
+        Certificado.objects.filter(pk=cls.revogado.pk).update(revogado_em=timezone.now())
+
+    def setUp(self):
+        midia = tempfile.TemporaryDirectory()
+        self.addCleanup(midia.cleanup)
+        configuracao = override_settings(MEDIA_ROOT=midia.name)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+        self.client.force_login(self.organizador)
+
+    def test_emitir_recusa_revogado(self):
+        resposta = self.client.get(reverse('emitir_certificado', args=[self.revogado.inscricao_id]))
+
+        self.assertRedirects(resposta, reverse('detalhes_evento', args=[self.evento.id]), fetch_redirect_response=False)
+        self.revogado.refresh_from_db()
+        self.assertFalse(self.revogado.arquivo_pdf)
+
+    def test_zip_sem_revogados(self):
+        resposta = self.client.get(reverse('baixar_certificados_evento', args=[self.evento.id]))
+
+        pacote = zipfile.ZipFile(io.BytesIO(b''.join(resposta.streaming_content)))
+        self.valido.refresh_from_db()
+        self.assertEqual(pacote.namelist(), [nome_no_zip(self.valido)])
+
+    def test_impressao_conta_so_os_validos(self):
+        with override_settings(CERTIFICADOS_IMPRESSAO_MAXIMO=1):
+            resposta = self.client.get(reverse('imprimir_certificados_evento', args=[self.evento.id]))
+
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta['Content-Type'], 'application/pdf')
+
+    def test_renderizacao_ignora_revogados(self):
+        GerarCertificados(stdout=io.StringIO()).renderizar_pdfs([self.evento], workers=1, chunk_size=1)
+
+        self.valido.refresh_from_db()
+        self.revogado.refresh_from_db()
+        self.assertTrue(self.valido.arquivo_pdf)
+        self.assertFalse(self.revogado.arquivo_pdf)
+
+
+class ThreadImediata:
+    """Substitui threading.Thread executando o alvo na hora, na conexão do teste"""
+
+    def __init__(self, target, args=(), **kwargs):
+        self.target = target
+        self.args = args
+
+    def start(self):
+        self.target(*self.args)
+
+
+@mock.patch('certificados.varredura.threading.Thread', ThreadImediata)
+class VarreduraAgendadaTests(TestCase):
+    """A varredura automática da hora só é consumida quando de fato roda"""
+
+    def test_varredura_ocupada_devolve_a_agenda(self):
+        adquirir(TRAVA_VARREDURA, 3600)  # gerar_certificados --intervalo em outro processo
+
+        self.assertTrue(varrer_em_segundo_plano())
+        self.assertIsNotNone(adquirir(TRAVA_AGENDA, INTERVALO_VARREDURA))
+
+    def test_varredura_realizada_consome_a_agenda(self):
+        self.assertTrue(varrer_em_segundo_plano())
+        self.assertIsNone(adquirir(TRAVA_AGENDA, INTERVALO_VARREDURA))
+        self.assertFalse(varrer_em_segundo_plano())
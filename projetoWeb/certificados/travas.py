@@ -0,0 +1,87 @@
+"""
+Travas (leases) no banco para tarefas periódicas
+O LocMemCache é por processo; com vários workers cada um teria o seu "já
+rodei nesta hora". A trava fica em uma linha da tabela trava_execucao, é
+tomada com um UPDATE/INSERT condicional e expira sozinha se o dono morrer.
+"""
+import os
+import socket
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .models import TravaExecucao
+
+
+class TravaOcupada(Exception):
+    """Erro levantado quando outro processo segura a trava"""
+
+    def __init__(self, nome):
+        super().__init__(f'A trava "{nome}" está com outro processo.')
+        self.nome = nome
+
+
+def identificador():
+    """Dono da trava: máquina, processo e um sufixo único por aquisição"""
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+
+def adquirir(nome, duracao):
+    """
+    Tenta tomar a trava por `duracao` (timedelta ou segundos)
+
+    Retorna o identificador do dono, ou None se outro processo a segura e ela
+    ainda não expirou.
+    """
+    if not isinstance(duracao, timedelta):
+        duracao = timedelta(seconds=duracao)
+
+    dono = identificador()
+    agora = timezone.now()
+
+    # Assume uma trava livre (expirada); só um UPDATE concorrente vence
+    assumidas = TravaExecucao.objects.filter(nome=nome, expira_em__lte=agora).update(
+        dono=dono, adquirida_em=agora, expira_em=agora + duracao
+    )
+    if assumidas:
+        return dono
+
+    # Primeira vez: cria a linha; a chave primária impede dois donos
+    try:
+        with transaction.atomic():
+            TravaExecucao.objects.create(nome=nome, dono=dono, adquirida_em=agora, expira_em=agora + duracao)
+    except IntegrityError:
+        return None
+    return dono
+
+
+def renovar(nome, dono, duracao):
+    """Estende o prazo de uma trava que ainda é nossa; retorna False se foi perdida"""
+    if not isinstance(duracao, timedelta):
+        duracao = timedelta(seconds=duracao)
+    return bool(
+        TravaExecucao.objects.filter(nome=nome, dono=dono).update(expira_em=timezone.now() + duracao)
+    )
+
+
+def liberar(nome, dono):
+    """Libera a trava, se ainda for nossa"""
+    TravaExecucao.objects.filter(nome=nome, dono=dono).update(expira_em=timezone.now())
+
+
+@contextmanager
+def travar(nome, duracao):
+    """
+    Executa o bloco segurando a trava e a libera ao sair
+
+    Levanta TravaOcupada se outro processo a segura. O bloco recebe o dono,
+    para renovar a trava em execuções longas.
+    """
+    dono = adquirir(nome, duracao)
+    if dono is None:
+        raise TravaOcupada(nome)
+    try:
+        yield dono
+    finally:
+        liberar(nome, dono)
@@ -3,7 +3,10 @@ from . import views
 
 urlpatterns = [
     path('emitir/<int:inscricao_id>/', views.emitir_certificado, name='emitir_certificado'),
+    path('evento/<int:evento_id>/zip/', views.baixar_certificados_evento, name='baixar_certificados_evento'),
+    path('evento/<int:evento_id>/impressao/', views.imprimir_certificados_evento, name='imprimir_certificados_evento'),
     path('validar/', views.validar_certificado, name='validar_certificado'),
+    path('verificar/<str:token>/', views.verificar_certificado, name='verificar_certificado'),
     path('meus/', views.meus_certificados, name='meus_certificados'),
     path('visualizar/<int:certificado_id>/', views.visualizar_certificado, name='visualizar_certificado'),
 ]
\ No newline at end of file
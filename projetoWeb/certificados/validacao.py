@@ -0,0 +1,75 @@
+"""
+Validação de certificados em lote
+Instituições parceiras enviam várias centenas de códigos por chamada. Os
+resultados de cada código ficam em cache por pouco tempo; os que faltam são
+resolvidos juntos, com uma única consulta codigo_validacao__in.
+"""
+import uuid
+from django.core.cache import cache
+from .models import Certificado
+
+TAMANHO_MAXIMO_VALIDACAO = 300
+
+# Resultados (inclusive "não encontrado") ficam em cache por 1 minuto
+VALIDADE_CACHE = 60
+PREFIXO_CACHE = 'validacao_certificado'
+
+
+def chave_cache(codigo):
+    return f'{PREFIXO_CACHE}:{codigo}'
+
+
+def _resultado(certificado):
+    if certificado is None:
+        return {'valido': False, 'situacao': 'nao_encontrado'}
+    if certificado.revogado_em:
+        return {'valido': False, 'situacao': 'revogado'}
+
+    inscricao = certificado.inscricao
+    evento = inscricao.evento
+    return {
+        'valido': True,
+        'situacao': 'valido',
+        'participante': inscricao.usuario.get_full_name(),
+        'evento': evento.titulo,
+        'tipo': evento.get_tipo_display(),
+        'data_inicio': evento.data_inicio.isoformat(),
+        'data_fim': evento.data_fim.isoformat(),
+        'data_emissao': certificado.data_emissao.date().isoformat(),
+    }
+
+
+def validar_codigos(codigos):
+    """
+    Valida uma lista de códigos e retorna um resultado por código, na ordem
+    recebida (códigos repetidos aparecem uma vez)
+
+    Situações: valido, revogado, nao_encontrado e formato_invalido.
+    """
+    normalizados = {}
+    for codigo in codigos:
+        try:
+            normalizados[codigo] = str(uuid.UUID(str(codigo).strip()))
+        except ValueError:
+            normalizados[codigo] = None
+
+    unicos = {codigo for codigo in normalizados.values() if codigo}
+    em_cache = cache.get_many([chave_cache(codigo) for codigo in unicos])
+    resultados = {codigo: em_cache[chave_cache(codigo)] for codigo in unicos if chave_cache(codigo) in em_cache}
+
+    faltantes = unicos - resultados.keys()
+    if faltantes:
+        encontrados = {
+            str(certificado.codigo_validacao): certificado
+            for certificado in Certificado.objects.filter(
+                codigo_validacao__in=faltantes
+            ).select_related('inscricao__usuario', 'inscricao__evento')
+        }
+        novos = {codigo: _resultado(encontrados.get(codigo)) for codigo in faltantes}
+        cache.set_many({chave_cache(codigo): resultado for codigo, resultado in novos.items()}, VALIDADE_CACHE)
+        resultados.update(novos)
+
+    return [
+        {'codigo': codigo, **(resultados[normalizado] if normalizado else {'valido': False, 'situacao': 'formato_invalido'})}
+        for codigo, normalizado in normalizados.items()
+    ]
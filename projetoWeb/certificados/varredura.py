@@ -0,0 +1,242 @@
+"""
+Varredura de certificados
+Gera os certificados dos eventos finalizados e fecha esses eventos. Roda fora
+do ciclo das requisições: em uma thread disparada pelo AutoCertificadoMiddleware
+ou no laço do comando gerar_certificados --intervalo. Travas no banco garantem
+que só um processo varre por vez e que a varredura automática roda uma vez por
+hora no total, não uma vez por worker. Os certificados são gravados em lotes
+transacionais e a varredura retoma de onde parou se for interrompida.
+"""
+import logging
+import threading
+import time
+from django.db import connection, transaction
+from django.utils import timezone
+from eventos.models import Evento, Inscricao
+from .models import Certificado
+from .travas import adquirir, liberar, renovar, travar, TravaOcupada
+
+logger = logging.getLogger(__name__)
+
+# Trava de execução: segura enquanto a varredura roda, renovada a cada evento
+TRAVA_VARREDURA = 'varredura_certificados'
+DURACAO_TRAVA = 15 * 60
+
+# Trava de agenda: nunca é liberada, só expira; marca a última varredura automática
+TRAVA_AGENDA = 'varredura_certificados_agenda'
+INTERVALO_VARREDURA = 60 * 60
+
+# Inscrições por lote: dois bulk_create (certificados e logs) por transação
+TAMANHO_LOTE = 500
+
+# Impede duas varreduras simultâneas no mesmo processo
+_em_execucao = threading.Lock()
+
+
+def _criar_lote(evento, inscricoes, automatico):
+    """
+    Cria os certificados e os logs de um lote de inscrições em uma única transação
+
+    Inscrições que ganharam certificado por outro caminho (emissão manual) no
+    meio do lote são ignoradas; retorna só os certificados criados aqui.
+    """
+    from auditoria.models import LogAuditoria
+
+    novos = [Certificado(inscricao=inscricao) for inscricao in inscricoes]
+    with transaction.atomic():
+        # Com ignore_conflicts o banco não devolve os ids: relê pelos códigos gerados
+        Certificado.objects.bulk_create(novos, ignore_conflicts=True)
+        certificados = list(
+            Certificado.objects.filter(
+                codigo_validacao__in=[certificado.codigo_validacao for certificado in novos]
+            ).select_related('inscricao__usuario', 'inscricao__evento').order_by('id')
+        )
+        LogAuditoria.objects.bulk_create([
+            LogAuditoria.montar(
+                usuario=None,  # Sistema
+                acao='GERAR_CERTIFICADO',
+                descricao=f'Certificado gerado automaticamente para {certificado.inscricao.usuario.get_full_name()} - {evento.titulo}',
+                dados_adicionais={
+                    'evento_id': evento.id,
+                    'evento_titulo': evento.titulo,
+                    'usuario_id': certificado.inscricao.usuario_id,
+                    'certificado_id': certificado.id,
+                    'codigo_validacao': str(certificado.codigo_validacao),
+                    'automatico': automatico
+                }
+            )
+            for certificado in certificados
+        ])
+    return certificados
+
+
+def _notificar(certificados):
+    """Envia os emails do lote por uma conexão só e marca os entregues; retorna quantos"""
+    from usuarios.email import enviar_emails_certificado_disponivel
+
+    entregues = enviar_emails_certificado_disponivel(certificados)
+    if entregues:
+        Certificado.objects.filter(id__in=[c.id for c in entregues]).update(notificado_em=timezone.now())
+    if len(entregues) < len(certificados):
+        logger.error(f'{len(certificados) - len(entregues)} email(s) de certificado não enviados; ficam pendentes')
+    return len(entregues)
+
+
+def notificar_pendentes(evento, tamanho_lote=TAMANHO_LOTE):
+    """Envia os emails de certificados do evento que ficaram sem notificação; retorna quantos"""
+    pendentes = Certificado.objects.filter(
+        inscricao__evento=evento,
+        notificado_em__isnull=True,
+        revogado_em__isnull=True
+    ).select_related('inscricao__usuario', 'inscricao__evento').order_by('id')
+
+    notificados = 0
+    ultimo = 0
+    while True:
+        lote = list(pendentes.filter(id__gt=ultimo)[:tamanho_lote])
+        if not lote:
+            break
+        ultimo = lote[-1].id
+        notificados += _notificar(lote)
+    return notificados
+
+
+def gerar_certificados_evento(evento, tamanho_lote=TAMANHO_LOTE, automatico=True, ao_concluir_lote=None):
+    """
+    Gera, em lotes, certificados para as inscrições com presença confirmada
+
+    Cada lote grava certificados e logs com dois bulk_create em uma transação
+    e depois envia seus emails por uma única conexão. Se a varredura for
+    interrompida (um erro no lote sobe e aborta o evento), lotes já gravados
+    ficam e os emails não entregues são enviados na próxima; o evento só é
+    fechado quando todas as inscrições elegíveis têm certificado. `ao_concluir_lote`
+    recebe o tamanho de cada lote (progresso, renovação da trava). Retorna
+    quantos certificados foram gerados.
+    """
+    # Retoma os emails de uma varredura anterior interrompida
+    notificados = notificar_pendentes(evento, tamanho_lote)
+
+    # Busca inscrições confirmadas COM PRESENÇA sem certificado
+    inscricoes = Inscricao.objects.filter(
+        evento=evento,
+        status='CONFIRMADA',
+        presenca_confirmada=True,  # Apenas quem teve presença confirmada
+        certificado__isnull=True
+    ).select_related('usuario', 'evento').order_by('id')
+
+    certificados_gerados = 0
+    ultimo = 0
+    while True:
+        lote = list(inscricoes.filter(id__gt=ultimo)[:tamanho_lote])
+        if not lote:
+            break
+        ultimo = lote[-1].id
+
+        certificados = _criar_lote(evento, lote, automatico)
+        certificados_gerados += len(certificados)
+        notificados += _notificar(certificados)
+        logger.info(f'{len(certificados)} certificado(s) gerado(s) automaticamente - Evento: {evento.titulo}')
+        if ao_concluir_lote:
+            ao_concluir_lote(len(certificados))
+
+    # Atualiza o status do evento para FECHADO, só se nenhuma inscrição ficou sem certificado
+    if (certificados_gerados > 0 or notificados > 0) and not inscricoes.exists():
+        evento.status = 'FECHADO'
+        evento.save()
+        logger.info(f'Evento "{evento.titulo}" fechado automaticamente após geração de {certificados_gerados} certificados')
+
+    return certificados_gerados
+
+
+def varrer_eventos_finalizados(ao_concluir_evento=None):
+    """
+    Gera os certificados de todos os eventos finalizados ainda abertos
+
+    `ao_concluir_evento` é chamado após cada evento (para renovar a trava).
+    Retorna um resumo com o número de eventos, de certificados e a duração.
+    """
+    inicio = time.perf_counter()
+
+    # Busca eventos finalizados que ainda estão abertos
+    eventos_finalizados = Evento.objects.filter(
+        data_fim__lt=timezone.now().date(),
+        status='ABERTO'
+    )
+
+    eventos = 0
+    certificados = 0
+    for evento in eventos_finalizados:
+        try:
+            certificados += gerar_certificados_evento(evento)
+            eventos += 1
+        except Exception as e:
+            logger.error(f'Erro ao processar evento {evento.titulo}: {e}')
+        if ao_concluir_evento:
+            ao_concluir_evento()
+
+    resumo = {
+        'eventos': eventos,
+        'certificados': certificados,
+        'duracao': time.perf_counter() - inicio,
+    }
+    logger.info(
+        f'Varredura de certificados: {resumo["eventos"]} evento(s), '
+        f'{resumo["certificados"]} certificado(s) em {resumo["duracao"]:.2f}s'
+    )
+    return resumo
+
+
+def varrer_com_trava():
+    """
+    Varre segurando a trava de execução
+
+    Retorna o resumo, ou None se outro processo já está varrendo.
+    """
+    try:
+        with travar(TRAVA_VARREDURA, DURACAO_TRAVA) as dono:
+            return varrer_eventos_finalizados(
+                ao_concluir_evento=lambda: renovar(TRAVA_VARREDURA, dono, DURACAO_TRAVA)
+            )
+    except TravaOcupada:
+        logger.info('Varredura de certificados já em andamento em outro processo')
+        return None
+
+
+def _executar(agendada):
+    try:
+        if varrer_com_trava() is None:
+            # Outro processo já está varrendo: esta hora não conta como feita
+            liberar(TRAVA_AGENDA, agendada)
+    except Exception:
+        logger.exception('Erro na varredura de certificados')
+    finally:
+        # A thread tem a própria conexão com o banco; fecha ao terminar
+        connection.close()
+        _em_execucao.release()
+
+
+def varrer_em_segundo_plano():
+    """
+    Dispara a varredura em uma thread separada e retorna imediatamente
+
+    Retorna False se já houver uma varredura em andamento neste processo ou
+    se algum processo já fez a varredura automática na última hora.
+    """
+    if not _em_execucao.acquire(blocking=False):
+        return False
+
+    try:
+        agendada = adquirir(TRAVA_AGENDA, INTERVALO_VARREDURA)
+    except Exception:
+        _em_execucao.release()
+        raise
+    if agendada is None:
+        _em_execucao.release()
+        return False
+
+    try:
+        threading.Thread(target=_executar, args=(agendada,), name='varredura-certificados', daemon=True).start()
+    except Exception:
+        _em_execucao.release()
+        raise
+    return True
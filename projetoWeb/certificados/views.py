@@ -1,14 +1,15 @@
+import tempfile
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponse
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.utils import ImageReader
-from io import BytesIO
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
 from eventos.models import Evento, Inscricao
 from .models import Certificado
-import datetime
+from .pdf import obter_pdf, dados_certificado, renderizar_pdf_impressao
+from .arquivos import zip_certificados
+from .assinatura import verificar_token
 
 @login_required
 def emitir_certificado(request, inscricao_id):
@@ -22,53 +23,113 @@ def emitir_certificado(request, inscricao_id):
     # Cria ou obtém o certificado
     certificado, created = Certificado.objects.get_or_create(inscricao=inscricao)
 
+    if certificado.revogado_em:
+        messages.error(request, 'Este certificado foi revogado e não pode mais ser emitido.')
+        return redirect('detalhes_evento', pk=inscricao.evento.pk)
+
     # Se foi criado agora, envia email
     if created:
         from usuarios.email import enviar_email_certificado_disponivel
-        enviar_email_certificado_disponivel(certificado)
+        if enviar_email_certificado_disponivel(certificado):
+            Certificado.objects.filter(pk=certificado.pk).update(notificado_em=timezone.now())
 
-    # Gera o PDF
-    buffer = BytesIO()
-    p = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-    
-    # Título
-    p.setFont("Helvetica-Bold", 24)
-    p.drawCentredString(width/2, height - 100, "CERTIFICADO")
-    
-    # Corpo do certificado
-    p.setFont("Helvetica", 14)
-    texto = f"Certificamos que {inscricao.usuario.get_full_name()}"
-    p.drawCentredString(width/2, height - 200, texto)
-    
-    texto2 = f"participou do evento '{inscricao.evento.titulo}'"
-    p.drawCentredString(width/2, height - 230, texto2)
-    
-    texto3 = f"realizado de {inscricao.evento.data_inicio.strftime('%d/%m/%Y')} a {inscricao.evento.data_fim.strftime('%d/%m/%Y')}"
-    p.drawCentredString(width/2, height - 260, texto3)
-    
-    texto4 = f"Local: {inscricao.evento.local}"
-    p.drawCentredString(width/2, height - 290, texto4)
-    
-    # Código de validação
-    p.setFont("Helvetica", 10)
-    p.drawCentredString(width/2, 100, f"Código de validação: {certificado.codigo_validacao}")
-    
-    # Data de emissão
-    p.drawCentredString(width/2, 80, f"Emitido em: {certificado.data_emissao.strftime('%d/%m/%Y')}")
-    
-    # Finaliza o PDF
-    p.showPage()
-    p.save()
-    
-    # Retorna o PDF
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="certificado_{inscricao.id}.pdf"'
+    # Reaproveita o PDF já gerado, se os dados impressos não mudaram
+    arquivo = obter_pdf(certificado)
+    response = FileResponse(
+        arquivo.open('rb'),
+        as_attachment=True,
+        filename=f'certificado_{inscricao.id}.pdf',
+        content_type='application/pdf'
+    )
     
     messages.success(request, 'Certificado emitido com sucesso!')
     return response
 
+@login_required
+def baixar_certificados_evento(request, evento_id):
+    """Baixa um ZIP com todos os certificados do evento, enviado à medida que é montado"""
+    evento = get_object_or_404(Evento, pk=evento_id)
+
+    if evento.organizador != request.user:
+        messages.error(request, 'Apenas o organizador pode baixar os certificados do evento.')
+        return redirect('detalhes_evento', pk=evento.pk)
+
+    # Revogados ficam de fora do pacote
+    certificados = Certificado.objects.filter(
+        inscricao__evento=evento,
+        revogado_em__isnull=True
+    ).select_related('inscricao__usuario', 'inscricao__evento').order_by('id')
+
+    if not certificados.exists():
+        messages.warning(request, 'Este evento ainda não tem certificados emitidos.')
+        return redirect('detalhes_evento', pk=evento.pk)
+
+    from auditoria.models import LogAuditoria
+    LogAuditoria.registrar(
+        usuario=request.user,
+        acao='CONSULTAR_CERTIFICADO',
+        descricao=f'Baixou os certificados do evento "{evento.titulo}" (ZIP)',
+        request=request,
+        dados_adicionais={'evento_id': evento.id}
+    )
+
+    response = StreamingHttpResponse(
+        zip_certificados(certificados.iterator(chunk_size=200)),
+        content_type='application/zip'
+    )
+    response['Content-Disposition'] = f'attachment; filename="certificados_evento_{evento.id}.zip"'
+    return response
+
+@login_required
+def imprimir_certificados_evento(request, evento_id):
+    """
+    Baixa todos os certificados do evento como páginas de um único PDF, para impressão
+
+    Limitado a CERTIFICADOS_IMPRESSAO_MAXIMO páginas: o reportlab mantém o
+    documento em memória e só o serializa no save(), então nada é enviado antes
+    da última página. Acima do limite o organizador é levado ao ZIP.
+    """
+    evento = get_object_or_404(Evento, pk=evento_id)
+
+    if evento.organizador != request.user:
+        messages.error(request, 'Apenas o organizador pode imprimir os certificados do evento.')
+        return redirect('detalhes_evento', pk=evento.pk)
+
+    # Revogados não são impressos: no papel o QR code pareceria válido
+    certificados = Certificado.objects.filter(
+        inscricao__evento=evento,
+        revogado_em__isnull=True
+    ).select_related('inscricao__usuario', 'inscricao__evento').order_by('id')
+
+    total = certificados.count()
+    if not total:
+        messages.warning(request, 'Este evento ainda não tem certificados emitidos.')
+        return redirect('detalhes_evento', pk=evento.pk)
+
+    maximo = getattr(settings, 'CERTIFICADOS_IMPRESSAO_MAXIMO', 500)
+    if total > maximo:
+        messages.warning(
+            request,
+            f'O PDF para impressão aceita até {maximo} certificados e este evento tem {total}. '
+            f'Use o download em ZIP.'
+        )
+        return redirect('detalhes_evento', pk=evento.pk)
+
+    # O PDF pronto vai para um arquivo temporário em disco e é enviado dele em blocos
+    arquivo = tempfile.TemporaryFile()
+    renderizar_pdf_impressao(
+        (dados_certificado(certificado) for certificado in certificados.iterator(chunk_size=200)),
+        arquivo
+    )
+    arquivo.seek(0)
+
+    return FileResponse(
+        arquivo,
+        as_attachment=True,
+        filename=f'certificados_evento_{evento.id}_impressao.pdf',
+        content_type='application/pdf'
+    )
+
 def validar_certificado(request):
     """Validação de certificado - não requer login para permitir validação pública"""
     if request.method == 'POST':
@@ -81,12 +142,22 @@ def validar_certificado(request):
             }
             return render(request, 'validacao_resultado.html', context)
 
+        # Token assinado do QR code: verificado sem consultar o banco
+        if ':' in codigo:
+            return redirect('verificar_certificado', token=codigo)
+
         try:
             certificado = Certificado.objects.get(codigo_validacao=codigo)
-            context = {
-                'valido': True,
-                'certificado': certificado,
-            }
+            if certificado.revogado_em:
+                context = {
+                    'valido': False,
+                    'mensagem': 'Este certificado foi revogado.',
+                }
+            else:
+                context = {
+                    'valido': True,
+                    'certificado': certificado,
+                }
         except Certificado.DoesNotExist:
             context = {
                 'valido': False,
@@ -102,6 +173,17 @@ def validar_certificado(request):
 
     return render(request, 'validar_certificado.html')
 
+def verificar_certificado(request, token):
+    """
+    Verificação do QR code - pública e sem consulta ao banco
+
+    Confere a assinatura do token e a lista de revogados (em memória); o nome
+    informado em ?nome= é comparado com o hash gravado no token.
+    """
+    nome = request.GET.get('nome', '').strip()
+    resultado = verificar_token(token, nome or None)
+    return render(request, 'verificacao_certificado.html', {**resultado, 'token': token, 'nome': nome})
+
 @login_required
 def meus_certificados(request):
     if request.user.is_organizador():
@@ -120,4 +202,8 @@ def visualizar_certificado(request, certificado_id):
         messages.error(request, 'Você não tem permissão para visualizar este certificado.')
         return redirect('meus_certificados')
 
+    if certificado.revogado_em:
+        messages.error(request, 'Este certificado foi revogado.')
+        return redirect('meus_certificados')
+
     return render(request, 'visualizar_certificado.html', {'certificado': certificado})
@@ -0,0 +1,111 @@
+"""
+Busca textual de eventos
+No SQLite usa uma tabela FTS5 (evento_fts) espelhando título, descrição e
+local, mantida pelos sinais de save/delete do Evento. Em outros bancos, ou se
+a tabela não existir, cai no filtro icontains original.
+"""
+import re
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+TABELA_FTS = 'evento_fts'
+
+# Pesos do bm25 por coluna: título, descrição, local
+PESOS = (10.0, 1.0, 3.0)
+
+_indice_encontrado = False
+
+
+def disponivel():
+    """Indica se o índice FTS5 existe no banco atual"""
+    global _indice_encontrado
+    if connection.vendor != 'sqlite':
+        return False
+    if not _indice_encontrado:
+        # Só o resultado positivo fica em cache: a tabela pode surgir após o migrate
+        _indice_encontrado = TABELA_FTS in connection.introspection.table_names()
+    return _indice_encontrado
+
+
+def montar_consulta(termo):
+    """
+    Converte o texto digitado em uma consulta FTS5 segura
+
+    Cada palavra vira um prefixo entre aspas ("palav"*), combinadas com AND,
+    de modo que operadores e aspas digitados pelo usuário não quebram a sintaxe.
+    """
+    palavras = re.findall(r'\w+', termo or '')
+    return ' '.join(f'"{palavra}"*' for palavra in palavras)
+
+
+def indexar_evento(evento):
+    if not disponivel():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABELA_FTS} WHERE rowid = %s', [evento.pk])
+        cursor.execute(
+            f'INSERT INTO {TABELA_FTS} (rowid, titulo, descricao, local) VALUES (%s, %s, %s, %s)',
+            [evento.pk, evento.titulo, evento.descricao, evento.local]
+        )
+
+
+def remover_evento(evento_id):
+    if not disponivel():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABELA_FTS} WHERE rowid = %s', [evento_id])
+
+
+def reconstruir_indice():
+    """Recria o índice a partir da tabela evento; retorna o total indexado"""
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABELA_FTS}')
+        cursor.execute(
+            f'INSERT INTO {TABELA_FTS} (rowid, titulo, descricao, local) '
+            f'SELECT id, titulo, descricao, local FROM evento'
+        )
+        cursor.execute(f"INSERT INTO {TABELA_FTS} ({TABELA_FTS}) VALUES ('optimize')")
+        cursor.execute(f'SELECT COUNT(*) FROM {TABELA_FTS}')
+        return cursor.fetchone()[0]
+
+
+def filtrar(queryset, termo):
+    """Filtra o queryset de eventos pelo termo buscado, sem ordenar"""
+    consulta = montar_consulta(termo)
+    if not consulta:
+        return queryset.none()
+
+    if not disponivel():
+        return queryset.filter(
+            Q(titulo__icontains=termo) |
+            Q(descricao__icontains=termo) |
+            Q(local__icontains=termo)
+        )
+
+    return queryset.filter(
+        id__in=RawSQL(f'SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s', [consulta])
+    )
+
+
+def buscar(queryset, termo):
+    """
+    Filtra o queryset de eventos pelo termo buscado
+
+    Retorna o queryset anotado com `relevancia` (menor = mais relevante) e
+    já ordenado por ela. Sem índice FTS, usa icontains e relevância constante.
+    """
+    queryset = filtrar(queryset, termo)
+    consulta = montar_consulta(termo)
+
+    if not consulta or not disponivel():
+        return queryset.annotate(relevancia=RawSQL('0', [])).order_by('data_inicio')
+
+    pesos = ', '.join(str(peso) for peso in PESOS)
+    return queryset.annotate(
+        relevancia=RawSQL(
+            f'SELECT bm25({TABELA_FTS}, {pesos}) FROM {TABELA_FTS} '
+            f'WHERE {TABELA_FTS} MATCH %s AND {TABELA_FTS}.rowid = evento.id',
+            [consulta]
+        )
+    ).order_by('relevancia', 'data_inicio')
@@ -0,0 +1,86 @@
+"""
+Contexto da página de detalhes do evento
+O evento e tudo o que depende do usuário (inscrito, intenção de sorteio,
+posição na lista de espera) vêm em uma única consulta anotada; a lista de
+participantes, quando exibida, é paginada (ver participantes.py). O número de
+consultas não depende do tamanho do evento.
+"""
+from django.db.models import Count, Exists, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.shortcuts import get_object_or_404
+from .models import Evento, Inscricao, ListaEspera, IntencaoInscricao
+from . import participantes
+
+
+def _posicao_lista_espera(usuario):
+    """Subconsulta com a posição do usuário na fila do evento (ou NULL)"""
+    a_frente = ListaEspera.objects.filter(
+        evento_id=OuterRef('evento_id')
+    ).filter(
+        Q(data_entrada__lt=OuterRef('data_entrada')) |
+        Q(data_entrada=OuterRef('data_entrada'), id__lt=OuterRef('id'))
+    ).order_by().values('evento_id').annotate(total=Count('id')).values('total')
+
+    entrada = ListaEspera.objects.filter(
+        evento_id=OuterRef('pk'),
+        usuario=usuario
+    ).annotate(
+        posicao=Coalesce(Subquery(a_frente), Value(0)) + 1
+    ).values('posicao')[:1]
+
+    return Subquery(entrada)
+
+
+def _evento_anotado(evento_id, usuario):
+    eventos = Evento.objects.select_related('organizador')
+
+    if usuario.is_organizador():
+        eventos = eventos.annotate(
+            inscrito=Value(False),
+            tem_intencao=Value(False),
+            posicao_lista_espera=Value(None, output_field=IntegerField())
+        )
+    else:
+        eventos = eventos.annotate(
+            inscrito=Exists(
+                Inscricao.objects.filter(evento_id=OuterRef('pk'), usuario=usuario, status='CONFIRMADA')
+            ),
+            tem_intencao=Exists(
+                IntencaoInscricao.objects.filter(evento_id=OuterRef('pk'), usuario=usuario)
+            ),
+            posicao_lista_espera=_posicao_lista_espera(usuario)
+        )
+
+    return get_object_or_404(eventos, pk=evento_id)
+
+
+def contexto_detalhes(evento_id, usuario, params=None):
+    """
+    Monta o contexto de detalhes_evento
+
+    Usa uma consulta para o evento anotado e, para organizadores, mais duas
+    para a página de participantes (filtrada por `params`, a querystring) e
+    sua contagem; as páginas seguintes vêm de participantes_evento.
+    """
+    evento = _evento_anotado(evento_id, usuario)
+    gerencia = usuario.is_organizador() or evento.organizador_id == usuario.id
+
+    params = params or {}
+    filtros_participantes = participantes.ler_filtros(params)
+    participantes_pagina = None
+    if gerencia:
+        # Sem JavaScript, "Carregar mais" navega para ?apos=<id> nesta mesma página
+        participantes_pagina = participantes.pagina(evento, filtros_participantes, apos=params.get('apos'))
+
+    inscrito = evento.inscrito
+    return {
+        'evento': evento,
+        'inscrito': inscrito,
+        # Só interessa a quem ainda não está inscrito
+        'posicao_lista_espera': None if inscrito else evento.posicao_lista_espera,
+        'intencao': not inscrito and evento.tem_intencao and evento.usa_sorteio(),
+        'pode_inscrever': not usuario.is_organizador() and not inscrito and evento.esta_aberto(),
+        'participantes': participantes_pagina,
+        'filtros_participantes': filtros_participantes,
+        'presenca_choices': participantes.PRESENCA_CHOICES,
+    }
@@ -26,7 +26,8 @@ class EventoForm(forms.ModelForm):
     class Meta:
         model = Evento
         fields = ['tipo', 'titulo', 'descricao', 'data_inicio', 'data_fim',
-                 'horario', 'local', 'vagas', 'professor_responsavel', 'banner', 'status']
+                 'horario', 'local', 'vagas', 'professor_responsavel', 'banner', 'status',
+                 'modo_inscricao', 'sorteio_encerramento']
         widgets = {
             'tipo': forms.Select(attrs={'class': 'form-control'}),
             'titulo': forms.TextInput(attrs={
@@ -60,6 +61,11 @@ class EventoForm(forms.ModelForm):
                 'placeholder': 'Número de vagas'
             }),
             'status': forms.Select(attrs={'class': 'form-control'}),
+            'modo_inscricao': forms.Select(attrs={'class': 'form-control'}),
+            'sorteio_encerramento': forms.DateTimeInput(
+                attrs={'type': 'datetime-local', 'class': 'form-control'},
+                format='%Y-%m-%dT%H:%M'
+            ),
         }
 
     def clean_data_inicio(self):
@@ -120,4 +126,9 @@ class EventoForm(forms.ModelForm):
                     'data_fim': 'A data de término não pode ser anterior à data de início.'
                 })
 
+        if cleaned_data.get('modo_inscricao') == 'SORTEIO' and not cleaned_data.get('sorteio_encerramento'):
+            raise ValidationError({
+                'sorteio_encerramento': 'Informe até quando os interessados podem se registrar para o sorteio.'
+            })
+
         return cleaned_data
\ No newline at end of file
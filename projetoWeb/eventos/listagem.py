@@ -0,0 +1,163 @@
+"""
+Listagem de eventos com filtros, facetas e paginação por chave (keyset)
+A página é buscada com WHERE (data_inicio, id) < cursor + LIMIT, então o custo
+não cresce com o histórico de eventos, ao contrário de OFFSET ou de listar tudo
+"""
+from datetime import date
+from urllib.parse import urlencode
+from django.db.models import Count, Q
+from .models import Evento
+from .busca import buscar, filtrar
+
+TAMANHO_PAGINA = 12
+
+# Com busca textual a ordem é por relevância; mostra só os mais relevantes
+LIMITE_BUSCA = 50
+
+
+def _data(valor):
+    try:
+        return date.fromisoformat(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def ler_filtros(params):
+    """Lê e valida os filtros da querystring, descartando valores inválidos"""
+    tipos = dict(Evento.TIPO_CHOICES)
+    status = dict(Evento.STATUS_CHOICES)
+
+    return {
+        'tipo': params.get('tipo') if params.get('tipo') in tipos else '',
+        'status': params.get('status') if params.get('status') in status else '',
+        'data_de': _data(params.get('data_de')),
+        'data_ate': _data(params.get('data_ate')),
+        'q': params.get('q', '').strip(),
+    }
+
+
+def _querystring(filtros, **extra):
+    valores = {**filtros, **extra}
+    return urlencode({
+        chave: valor.isoformat() if isinstance(valor, date) else valor
+        for chave, valor in valores.items()
+        if valor
+    })
+
+
+def _base(filtros):
+    """Filtro de período, comum à página e às facetas"""
+    eventos = Evento.objects.all()
+
+    # Eventos que se sobrepõem ao período escolhido
+    if filtros['data_de']:
+        eventos = eventos.filter(data_fim__gte=filtros['data_de'])
+    if filtros['data_ate']:
+        eventos = eventos.filter(data_inicio__lte=filtros['data_ate'])
+
+    return eventos
+
+
+def facetas(filtros):
+    """
+    Contagens por tipo e por status em uma única consulta agrupada
+
+    Cada faceta ignora o próprio filtro (a contagem de tipos respeita o status
+    escolhido e vice-versa), como de costume em buscas facetadas.
+    """
+    eventos = _base(filtros)
+    if filtros['q']:
+        eventos = filtrar(eventos, filtros['q'])
+
+    linhas = eventos.values('tipo', 'status').annotate(total=Count('id')).order_by()
+
+    por_tipo = {valor: 0 for valor, _ in Evento.TIPO_CHOICES}
+    por_status = {valor: 0 for valor, _ in Evento.STATUS_CHOICES}
+    for linha in linhas:
+        if not filtros['status'] or linha['status'] == filtros['status']:
+            por_tipo[linha['tipo']] = por_tipo.get(linha['tipo'], 0) + linha['total']
+        if not filtros['tipo'] or linha['tipo'] == filtros['tipo']:
+            por_status[linha['status']] = por_status.get(linha['status'], 0) + linha['total']
+
+    def opcoes(campo, choices, contagens):
+        return [
+            {
+                'valor': valor,
+                'label': label,
+                'total': contagens.get(valor, 0),
+                'ativo': filtros[campo] == valor,
+                # Clicar na faceta ativa remove o filtro
+                'url': '?' + _querystring(filtros, **{campo: '' if filtros[campo] == valor else valor}),
+            }
+            for valor, label in choices
+        ]
+
+    return {
+        'tipos': opcoes('tipo', Evento.TIPO_CHOICES, por_tipo),
+        'status': opcoes('status', Evento.STATUS_CHOICES, por_status),
+    }
+
+
+def _ler_cursor(valor):
+    """Cursor no formato AAAA-MM-DD.id"""
+    try:
+        data_cursor, id_cursor = valor.split('.')
+        return date.fromisoformat(data_cursor), int(id_cursor)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _cursor(evento):
+    return f'{evento.data_inicio.isoformat()}.{evento.id}'
+
+
+def pagina(filtros, apos=None, antes=None):
+    """
+    Retorna a página de eventos e os links de navegação
+
+    A ordem é (data_inicio, id) decrescente. `apos` avança a partir do último
+    item visto; `antes` volta a partir do primeiro.
+    """
+    eventos = _base(filtros)
+    if filtros['tipo']:
+        eventos = eventos.filter(tipo=filtros['tipo'])
+    if filtros['status']:
+        eventos = eventos.filter(status=filtros['status'])
+
+    if filtros['q']:
+        itens = list(buscar(eventos, filtros['q'])[:LIMITE_BUSCA])
+        return {'eventos': itens, 'proxima': None, 'anterior': None, 'limite_busca': len(itens) == LIMITE_BUSCA}
+
+    cursor_apos = _ler_cursor(apos)
+    cursor_antes = _ler_cursor(antes) if not cursor_apos else None
+
+    if cursor_antes:
+        data_cursor, id_cursor = cursor_antes
+        eventos = eventos.filter(
+            Q(data_inicio__gt=data_cursor) | Q(data_inicio=data_cursor, id__gt=id_cursor)
+        ).order_by('data_inicio', 'id')
+    else:
+        if cursor_apos:
+            data_cursor, id_cursor = cursor_apos
+            eventos = eventos.filter(
+                Q(data_inicio__lt=data_cursor) | Q(data_inicio=data_cursor, id__lt=id_cursor)
+            )
+        eventos = eventos.order_by('-data_inicio', '-id')
+
+    # Um item a mais indica se existe outra página naquela direção
+    itens = list(eventos[:TAMANHO_PAGINA + 1])
+    tem_mais = len(itens) > TAMANHO_PAGINA
+    itens = itens[:TAMANHO_PAGINA]
+
+    if cursor_antes:
+        itens.reverse()
+        tem_proxima, tem_anterior = True, tem_mais
+    else:
+        tem_proxima, tem_anterior = tem_mais, cursor_apos is not None
+
+    return {
+        'eventos': itens,
+        'proxima': '?' + _querystring(filtros, apos=_cursor(itens[-1])) if itens and tem_proxima else None,
+        'anterior': '?' + _querystring(filtros, antes=_cursor(itens[0])) if itens and tem_anterior else None,
+        'limite_busca': False,
+    }
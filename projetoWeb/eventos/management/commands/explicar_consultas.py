@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from eventos.models import Evento, Inscricao
+from certificados.models import Certificado
+from usuarios.models import Usuario
+
+
+class Command(BaseCommand):
+    help = 'Mostra o plano de execução (EXPLAIN) das consultas mais frequentes para conferir o uso dos índices'
+
+    def consultas(self):
+        """Consultas dos caminhos quentes, com valores fictícios nos filtros"""
+        hoje = timezone.now().date()
+        return [
+            (
+                'Inscritos confirmados de um evento (detalhes_evento)',
+                Inscricao.objects.filter(evento_id=1, status='CONFIRMADA')
+            ),
+            (
+                'Inscrições confirmadas do usuário (dashboard, minhas_inscricoes)',
+                Inscricao.objects.filter(usuario_id=1, status='CONFIRMADA')
+            ),
+            (
+                'Usuário já inscrito no evento (pode_inscrever)',
+                Inscricao.objects.filter(usuario_id=1, evento_id=1, status='CONFIRMADA')
+            ),
+            (
+                'Próximos eventos abertos (dashboard, API)',
+                Evento.objects.filter(status='ABERTO').order_by('data_inicio')[:5]
+            ),
+            (
+                'Eventos finalizados ainda abertos (geração de certificados)',
+                Evento.objects.filter(data_fim__lt=hoje, status='ABERTO')
+            ),
+            (
+                'Confirmação de email por código',
+                Usuario.objects.filter(codigo_confirmacao='codigo')
+            ),
+            (
+                'Validação de certificado por código',
+                Certificado.objects.filter(codigo_validacao='00000000-0000-0000-0000-000000000000')
+            ),
+        ]
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f'Planos de execução ({connection.vendor})'))
+
+        sem_indice = 0
+        for descricao, queryset in self.consultas():
+            plano = queryset.explain()
+            self.stdout.write(f'\n{descricao}')
+            self.stdout.write(f'  SQL: {queryset.query}')
+            for linha in plano.splitlines():
+                self.stdout.write(f'  {linha}')
+
+            # No SQLite, "SCAN <tabela>" sem índice indica varredura completa
+            varredura = any(
+                'SCAN' in linha and 'INDEX' not in linha
+                for linha in plano.splitlines()
+            )
+            if varredura:
+                sem_indice += 1
+                self.stdout.write(self.style.WARNING('  ✗ Varredura completa da tabela'))
+            else:
+                self.stdout.write(self.style.SUCCESS('  ✓ Usa índice'))
+
+        if sem_indice:
+            self.stdout.write(self.style.WARNING(f'\n{sem_indice} consulta(s) sem índice'))
+        else:
+            self.stdout.write(self.style.SUCCESS('\nTodas as consultas usam índice'))
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from eventos.models import Evento
+from eventos.reservas import ReservaIndisponivel
+from eventos.sorteio import realizar_sorteio
+
+
+class Command(BaseCommand):
+    help = 'Realiza o sorteio de vagas dos eventos cujo período de interesse terminou'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--evento-id',
+            type=int,
+            help='ID do evento específico (ignora a data de encerramento)'
+        )
+        parser.add_argument(
+            '--semente',
+            type=int,
+            help='Semente do sorteio, para reproduzir um resultado'
+        )
+        parser.add_argument(
+            '--rejeitar',
+            action='store_true',
+            help='Não coloca os não sorteados na lista de espera'
+        )
+
+    def handle(self, *args, **kwargs):
+        evento_id = kwargs.get('evento_id')
+        semente = kwargs.get('semente')
+        lista_espera = not kwargs.get('rejeitar')
+
+        self.stdout.write(self.style.SUCCESS('Iniciando sorteios...'))
+
+        if evento_id:
+            try:
+                eventos = [Evento.objects.get(id=evento_id, modo_inscricao='SORTEIO')]
+            except Evento.DoesNotExist:
+                self.stdout.write(self.style.ERROR(f'Evento com sorteio e ID {evento_id} não encontrado'))
+                return
+        else:
+            eventos = Evento.objects.filter(
+                modo_inscricao='SORTEIO',
+                sorteio_realizado_em__isnull=True,
+                sorteio_encerramento__lte=timezone.now(),
+                status='ABERTO'
+            )
+
+            if not eventos.exists():
+                self.stdout.write(self.style.WARNING('Nenhum evento aguardando sorteio'))
+                return
+
+        for evento in eventos:
+            self.stdout.write(f'\nSorteando vagas do evento: {evento.titulo}')
+            try:
+                sorteados, nao_sorteados = realizar_sorteio(evento, semente=semente, lista_espera=lista_espera)
+            except ReservaIndisponivel as e:
+                self.stdout.write(self.style.WARNING(f'  → {e.mensagem}'))
+                continue
+
+            destino = 'lista de espera' if lista_espera else 'rejeitados'
+            self.stdout.write(self.style.SUCCESS(f'  ✓ Sorteados: {sorteados}'))
+            self.stdout.write(f'  → Não sorteados ({destino}): {nao_sorteados}')
+            self.stdout.write(f'  → Semente: {evento.sorteio_semente}')
+
+        self.stdout.write(self.style.SUCCESS('\nSorteios concluídos!'))
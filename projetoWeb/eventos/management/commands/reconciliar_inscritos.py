@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from eventos.models import Evento, Inscricao
+
+TAMANHO_LOTE = 500
+
+
+class Command(BaseCommand):
+    help = 'Recalcula o contador de inscrições confirmadas dos eventos e corrige divergências'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas lista as divergências, sem corrigir'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options.get('dry_run')
+
+        self.stdout.write(self.style.SUCCESS('Verificando contadores de inscrições...'))
+
+        # Uma única consulta agrupada com a contagem real de cada evento
+        eventos = Evento.objects.annotate(
+            total_real=Count('inscricoes', filter=Q(inscricoes__status='CONFIRMADA'))
+        ).only('id', 'titulo', 'inscritos_confirmados')
+
+        divergentes = []
+        for evento in eventos.iterator(chunk_size=1000):
+            if evento.inscritos_confirmados != evento.total_real:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'  ✗ {evento.titulo}: contador={evento.inscritos_confirmados}, real={evento.total_real}'
+                    )
+                )
+                divergentes.append(evento.id)
+
+        if not divergentes:
+            self.stdout.write(self.style.SUCCESS('Nenhuma divergência encontrada'))
+            return
+
+        if dry_run:
+            self.stdout.write(
+                self.style.WARNING(f'\nTotal de eventos divergentes: {len(divergentes)} (nada foi alterado)')
+            )
+            return
+
+        # A contagem é refeita no próprio UPDATE: uma reserva confirmada entre a
+        # verificação acima e a correção não se perde (um valor absoluto lido antes
+        # desfaria o incremento e abriria espaço para vender vagas a mais)
+        total_real = Inscricao.objects.filter(
+            evento_id=OuterRef('pk'), status='CONFIRMADA'
+        ).order_by().values('evento_id').annotate(total=Count('id')).values('total')
+
+        with transaction.atomic():
+            for inicio in range(0, len(divergentes), TAMANHO_LOTE):
+                Evento.objects.filter(pk__in=divergentes[inicio:inicio + TAMANHO_LOTE]).update(
+                    inscritos_confirmados=Coalesce(Subquery(total_real), 0)
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(f'\nTotal de eventos corrigidos: {len(divergentes)}')
+        )
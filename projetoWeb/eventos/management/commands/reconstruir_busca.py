@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from eventos.busca import disponivel, reconstruir_indice
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca textual (FTS5) dos eventos'
+
+    def handle(self, *args, **options):
+        if not disponivel():
+            self.stdout.write(self.style.ERROR(
+                'Índice de busca indisponível: requer SQLite com FTS5 e a migração eventos.0010 aplicada'
+            ))
+            return
+
+        self.stdout.write(self.style.SUCCESS('Reconstruindo índice de busca...'))
+        total = reconstruir_indice()
+        self.stdout.write(self.style.SUCCESS(f'Total de eventos indexados: {total}'))
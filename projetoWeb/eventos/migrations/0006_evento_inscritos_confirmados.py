@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-18 03:09
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def preencher_inscritos_confirmados(apps, schema_editor):
+    Evento = apps.get_model("eventos", "Evento")
+    eventos = list(
+        Evento.objects.annotate(
+            total=Count("inscricoes", filter=Q(inscricoes__status="CONFIRMADA"))
+        )
+    )
+    for evento in eventos:
+        evento.inscritos_confirmados = evento.total
+    Evento.objects.bulk_update(eventos, ["inscritos_confirmados"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eventos", "0005_inscricao_presenca_confirmada"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evento",
+            name="inscritos_confirmados",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Contador de inscrições confirmadas (mantido pelas views e pela API)",
+            ),
+        ),
+        migrations.RunPython(
+            preencher_inscritos_confirmados, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2 on 2026-10-18 03:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eventos", "0006_evento_inscritos_confirmados"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ListaEspera",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data_entrada", models.DateTimeField(auto_now_add=True)),
+                (
+                    "evento",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lista_espera",
+                        to="eventos.evento",
+                    ),
+                ),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="listas_espera",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Lista de Espera",
+                "verbose_name_plural": "Listas de Espera",
+                "db_table": "lista_espera",
+                "ordering": ["data_entrada", "id"],
+                "unique_together": {("usuario", "evento")},
+            },
+        ),
+    ]
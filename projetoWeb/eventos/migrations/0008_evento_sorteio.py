@@ -0,0 +1,94 @@
+# Generated by Django 5.2 on 2026-10-18 03:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eventos", "0007_listaespera"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evento",
+            name="modo_inscricao",
+            field=models.CharField(
+                choices=[("ORDEM_CHEGADA", "Ordem de chegada"), ("SORTEIO", "Sorteio")],
+                default="ORDEM_CHEGADA",
+                help_text="No modo sorteio os interessados se registram até o encerramento e as vagas são sorteadas",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="evento",
+            name="sorteio_encerramento",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Fim do período de registro de interesse (modo sorteio)",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="evento",
+            name="sorteio_realizado_em",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="evento",
+            name="sorteio_semente",
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name="IntencaoInscricao",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("data_registro", models.DateTimeField(auto_now_add=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDENTE", "Aguardando sorteio"),
+                            ("SORTEADA", "Sorteada"),
+                            ("NAO_SORTEADA", "Não sorteada"),
+                        ],
+                        default="PENDENTE",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "evento",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="intencoes",
+                        to="eventos.evento",
+                    ),
+                ),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="intencoes_inscricao",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Intenção de Inscrição",
+                "verbose_name_plural": "Intenções de Inscrição",
+                "db_table": "intencao_inscricao",
+                "unique_together": {("usuario", "evento")},
+            },
+        ),
+    ]
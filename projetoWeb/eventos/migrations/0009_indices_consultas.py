@@ -0,0 +1,81 @@
+# Generated by Django 5.2 on 2026-10-18 03:14
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def cancelar_inscricoes_duplicadas(apps, schema_editor):
+    """Mantém só a inscrição confirmada mais antiga de cada (usuario, evento)"""
+    Evento = apps.get_model("eventos", "Evento")
+    Inscricao = apps.get_model("eventos", "Inscricao")
+
+    duplicadas = (
+        Inscricao.objects.filter(status="CONFIRMADA")
+        .values("usuario_id", "evento_id")
+        .annotate(total=Count("id"))
+        .filter(total__gt=1)
+    )
+    eventos_afetados = set()
+    for par in duplicadas:
+        ids = list(
+            Inscricao.objects.filter(
+                usuario_id=par["usuario_id"],
+                evento_id=par["evento_id"],
+                status="CONFIRMADA",
+            )
+            .order_by("data_inscricao", "id")
+            .values_list("id", flat=True)
+        )
+        Inscricao.objects.filter(id__in=ids[1:]).update(status="CANCELADA")
+        eventos_afetados.add(par["evento_id"])
+
+    # Corrige o contador dos eventos que tinham duplicatas
+    for evento in Evento.objects.filter(id__in=eventos_afetados).annotate(
+        total=Count("inscricoes", filter=Q(inscricoes__status="CONFIRMADA"))
+    ):
+        Evento.objects.filter(pk=evento.pk).update(inscritos_confirmados=evento.total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eventos", "0008_evento_sorteio"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(cancelar_inscricoes_duplicadas, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="evento",
+            index=models.Index(
+                fields=["status", "data_inicio"], name="evento_status_inicio_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="evento",
+            index=models.Index(
+                fields=["data_fim", "status"], name="evento_fim_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="inscricao",
+            index=models.Index(
+                fields=["evento", "status"], name="inscricao_evento_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="inscricao",
+            index=models.Index(
+                fields=["usuario", "status"], name="inscricao_usuario_status_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="inscricao",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status", "CONFIRMADA")),
+                fields=("usuario", "evento"),
+                name="inscricao_confirmada_unica",
+            ),
+        ),
+    ]
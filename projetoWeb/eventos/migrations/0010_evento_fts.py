@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-18 03:20
+
+from django.db import migrations
+
+
+def fts5_compilado(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any(opcao == "ENABLE_FTS5" for (opcao,) in cursor.fetchall())
+
+
+def criar_indice_busca(apps, schema_editor):
+    # Sem FTS5 a tabela não é criada e busca.disponivel() mantém o filtro icontains
+    if schema_editor.connection.vendor != "sqlite" or not fts5_compilado(schema_editor.connection):
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS evento_fts USING fts5("
+        "titulo, descricao, local, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        "INSERT INTO evento_fts (rowid, titulo, descricao, local) "
+        "SELECT id, titulo, descricao, local FROM evento"
+    )
+
+
+def remover_indice_busca(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS evento_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eventos", "0009_indices_consultas"),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice_busca, remover_indice_busca),
+    ]
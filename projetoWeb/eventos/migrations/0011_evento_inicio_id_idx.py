@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-18 03:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eventos", "0010_evento_fts"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="evento",
+            index=models.Index(
+                fields=["data_inicio", "id"], name="evento_inicio_id_idx"
+            ),
+        ),
+    ]
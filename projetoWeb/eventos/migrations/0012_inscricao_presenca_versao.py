@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 03:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eventos", "0011_evento_inicio_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="inscricao",
+            name="presenca_versao",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -1,4 +1,7 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.core.exceptions import ValidationError
@@ -27,6 +30,11 @@ class Evento(models.Model):
         ('CANCELADO', 'Cancelado'),
     ]
 
+    MODO_INSCRICAO_CHOICES = [
+        ('ORDEM_CHEGADA', 'Ordem de chegada'),
+        ('SORTEIO', 'Sorteio'),
+    ]
+
     tipo = models.CharField(max_length=20, choices=TIPO_CHOICES)
     titulo = models.CharField(max_length=200)
     descricao = models.TextField()
@@ -44,6 +52,24 @@ class Evento(models.Model):
     )
     organizador = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='eventos_organizados')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='ABERTO')
+    inscritos_confirmados = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Contador de inscrições confirmadas (mantido pelas views e pela API)'
+    )
+    modo_inscricao = models.CharField(
+        max_length=20,
+        choices=MODO_INSCRICAO_CHOICES,
+        default='ORDEM_CHEGADA',
+        help_text='No modo sorteio os interessados se registram até o encerramento e as vagas são sorteadas'
+    )
+    sorteio_encerramento = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='Fim do período de registro de interesse (modo sorteio)'
+    )
+    sorteio_realizado_em = models.DateTimeField(null=True, blank=True, editable=False)
+    sorteio_semente = models.BigIntegerField(null=True, blank=True, editable=False)
     banner = models.ImageField(
         upload_to=evento_banner_path,
         blank=True,
@@ -58,10 +84,31 @@ class Evento(models.Model):
         verbose_name = 'Evento'
         verbose_name_plural = 'Eventos'
         ordering = ['-data_inicio']
+        indexes = [
+            # Dashboard, listagens e ordenação da API
+            models.Index(fields=['status', 'data_inicio'], name='evento_status_inicio_idx'),
+            # Varredura de eventos finalizados (certificados)
+            models.Index(fields=['data_fim', 'status'], name='evento_fim_status_idx'),
+            # Paginação por chave da listagem de eventos
+            models.Index(fields=['data_inicio', 'id'], name='evento_inicio_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.titulo} - {self.get_tipo_display()}"
 
+    # Só alterados por UPDATEs atômicos (reservas e sorteio); um save() comum
+    # (edição do evento, fechamento automático) com uma instância antiga não pode
+    # sobrescrevê-los, o que zeraria o contador ou liberaria um segundo sorteio
+    CAMPOS_ATUALIZADOS_POR_UPDATE = ('inscritos_confirmados', 'sorteio_realizado_em', 'sorteio_semente')
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.CAMPOS_ATUALIZADOS_POR_UPDATE
+            ]
+        super().save(*args, **kwargs)
+
     def clean(self):
         """Validações customizadas do modelo"""
         super().clean()
@@ -82,10 +129,50 @@ class Evento(models.Model):
         if self.vagas and self.vagas <= 0:
             raise ValidationError({'vagas': 'O número de vagas deve ser maior que zero.'})
 
+        # Eventos com sorteio precisam do fim do período de interesse
+        if self.modo_inscricao == 'SORTEIO' and not self.sorteio_encerramento:
+            raise ValidationError({'sorteio_encerramento': 'Informe até quando os interessados podem se registrar para o sorteio.'})
+
+    @property
+    def versao_cache(self):
+        """
+        Versão do evento usada nas chaves do cache de fragmentos
+
+        Muda a cada save() (atualizado_em) e a cada inscrição confirmada ou
+        cancelada (contador), então nenhum caminho de escrita precisa lembrar
+        de invalidar o cache, e a chave vale para todos os processos.
+        """
+        return f'{self.atualizado_em.timestamp():.6f}-{self.inscritos_confirmados}'
+
     @property
     def vagas_disponiveis(self):
-        inscritos = self.inscricoes.filter(status='CONFIRMADA').count()
-        return self.vagas - inscritos
+        return self.vagas - self.inscritos_confirmados
+
+    def incrementar_inscritos(self, quantidade=1):
+        """Incrementa atomicamente o contador de inscrições confirmadas"""
+        Evento.objects.filter(pk=self.pk).update(
+            inscritos_confirmados=F('inscritos_confirmados') + quantidade
+        )
+        self.refresh_from_db(fields=['inscritos_confirmados'])
+
+    def decrementar_inscritos(self, quantidade=1):
+        """Decrementa atomicamente o contador sem deixá-lo negativo"""
+        Evento.objects.filter(pk=self.pk, inscritos_confirmados__gte=quantidade).update(
+            inscritos_confirmados=F('inscritos_confirmados') - quantidade
+        )
+        self.refresh_from_db(fields=['inscritos_confirmados'])
+
+    def usa_sorteio(self):
+        """Indica se o evento ainda aguarda o sorteio das vagas"""
+        return self.modo_inscricao == 'SORTEIO' and self.sorteio_realizado_em is None
+
+    def periodo_interesse_aberto(self):
+        return (
+            self.usa_sorteio()
+            and self.status == 'ABERTO'
+            and self.sorteio_encerramento is not None
+            and timezone.now() < self.sorteio_encerramento
+        )
 
     def esta_aberto(self):
         return self.status == 'ABERTO' and self.vagas_disponiveis > 0
@@ -95,6 +182,19 @@ class Evento(models.Model):
             return False
         return not self.inscricoes.filter(usuario=usuario, status='CONFIRMADA').exists()
 
+@receiver(post_save, sender=Evento)
+def indexar_evento_busca(sender, instance, **kwargs):
+    """Mantém o índice de busca textual sincronizado com o evento"""
+    from .busca import indexar_evento
+    indexar_evento(instance)
+
+
+@receiver(post_delete, sender=Evento)
+def remover_evento_busca(sender, instance, **kwargs):
+    from .busca import remover_evento
+    remover_evento(instance.pk)
+
+
 class Inscricao(models.Model):
     STATUS_CHOICES = [
         ('CONFIRMADA', 'Confirmada'),
@@ -109,12 +209,95 @@ class Inscricao(models.Model):
         default=False,
         help_text='Confirmar presença para liberar certificado'
     )
+    # Incrementada a cada mudança de presença; detecta conflitos no check-in offline
+    presenca_versao = models.PositiveIntegerField(default=0, editable=False)
     
     class Meta:
         db_table = 'inscricao'
         verbose_name = 'Inscrição'
         verbose_name_plural = 'Inscrições'
+        indexes = [
+            models.Index(fields=['evento', 'status'], name='inscricao_evento_status_idx'),
+            models.Index(fields=['usuario', 'status'], name='inscricao_usuario_status_idx'),
+        ]
+        constraints = [
+            # Cancelamentos podem se repetir, mas só uma inscrição confirmada por usuário e evento
+            models.UniqueConstraint(
+                fields=['usuario', 'evento'],
+                condition=models.Q(status='CONFIRMADA'),
+                name='inscricao_confirmada_unica'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.usuario.get_full_name()} - {self.evento.titulo}"
 
+    @property
+    def token_checkin(self):
+        """Token do participante para o check-in na portaria (QR code ou digitado)"""
+        from django.utils.crypto import salted_hmac
+        return salted_hmac('eventos.checkin', f'{self.pk}:{self.usuario_id}:{self.evento_id}').hexdigest()[:16]
+
+    def definir_presenca(self, presenca):
+        """Confirma ou remove a presença; retorna False se ela já estava assim"""
+        atualizadas = Inscricao.objects.filter(
+            pk=self.pk, presenca_confirmada=not presenca
+        ).update(presenca_confirmada=presenca, presenca_versao=models.F('presenca_versao') + 1)
+        self.presenca_confirmada = presenca
+        return bool(atualizadas)
+
+    def cancelar(self):
+        """Cancela a inscrição e libera a vaga no contador do evento"""
+        with transaction.atomic():
+            atualizadas = Inscricao.objects.filter(
+                pk=self.pk, status='CONFIRMADA'
+            ).update(status='CANCELADA')
+            if atualizadas:
+                self.evento.decrementar_inscritos()
+        self.status = 'CANCELADA'
+        return bool(atualizadas)
+
+
+class ListaEspera(models.Model):
+    usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='listas_espera')
+    evento = models.ForeignKey(Evento, on_delete=models.CASCADE, related_name='lista_espera')
+    data_entrada = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'lista_espera'
+        verbose_name = 'Lista de Espera'
+        verbose_name_plural = 'Listas de Espera'
+        ordering = ['data_entrada', 'id']
+        unique_together = [('usuario', 'evento')]
+
+    def __str__(self):
+        return f"{self.usuario.get_full_name()} - {self.evento.titulo} (espera)"
+
+    def posicao(self):
+        """Posição na fila (1 = próximo a ser promovido)"""
+        return ListaEspera.objects.filter(evento_id=self.evento_id).filter(
+            models.Q(data_entrada__lt=self.data_entrada) |
+            models.Q(data_entrada=self.data_entrada, id__lt=self.id)
+        ).count() + 1
+
+
+class IntencaoInscricao(models.Model):
+    STATUS_CHOICES = [
+        ('PENDENTE', 'Aguardando sorteio'),
+        ('SORTEADA', 'Sorteada'),
+        ('NAO_SORTEADA', 'Não sorteada'),
+    ]
+
+    usuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, related_name='intencoes_inscricao')
+    evento = models.ForeignKey(Evento, on_delete=models.CASCADE, related_name='intencoes')
+    data_registro = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDENTE')
+
+    class Meta:
+        db_table = 'intencao_inscricao'
+        verbose_name = 'Intenção de Inscrição'
+        verbose_name_plural = 'Intenções de Inscrição'
+        unique_together = [('usuario', 'evento')]
+
+    def __str__(self):
+        return f"{self.usuario.get_full_name()} - {self.evento.titulo} ({self.get_status_display()})"
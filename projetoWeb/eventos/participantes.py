@@ -0,0 +1,79 @@
+"""
+Lista de participantes de um evento, paginada para eventos grandes
+A página é buscada por chave (id > cursor + LIMIT), com busca no servidor por
+nome, email e instituição e filtro de presença. A página de detalhes mostra a
+primeira página e carrega as seguintes sob demanda.
+"""
+from urllib.parse import urlencode
+from django.db.models import Q
+from .models import Inscricao
+
+TAMANHO_PAGINA = 50
+
+PRESENCA_CHOICES = [
+    ('sim', 'Presença confirmada'),
+    ('nao', 'Presença não confirmada'),
+]
+
+
+def ler_filtros(params):
+    """Lê os filtros da querystring, descartando valores inválidos"""
+    presenca = params.get('presenca')
+    return {
+        'q': params.get('q', '').strip(),
+        'presenca': presenca if presenca in dict(PRESENCA_CHOICES) else '',
+    }
+
+
+def _filtrar(evento, filtros):
+    inscricoes = Inscricao.objects.filter(evento=evento, status='CONFIRMADA')
+
+    # Cada palavra precisa aparecer em algum dos campos
+    for palavra in filtros['q'].split():
+        inscricoes = inscricoes.filter(
+            Q(usuario__first_name__icontains=palavra) |
+            Q(usuario__last_name__icontains=palavra) |
+            Q(usuario__email__icontains=palavra) |
+            Q(usuario__instituicao_ensino__icontains=palavra)
+        )
+
+    if filtros['presenca']:
+        inscricoes = inscricoes.filter(presenca_confirmada=filtros['presenca'] == 'sim')
+
+    return inscricoes
+
+
+def _ler_cursor(valor):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def pagina(evento, filtros, apos=None):
+    """
+    Retorna uma página de participantes confirmados, em ordem de inscrição
+
+    `total` é o número de participantes que atendem aos filtros e `proxima`
+    a URL da página seguinte (ou None). São duas consultas por página.
+    """
+    inscricoes = _filtrar(evento, filtros)
+    total = inscricoes.count()
+
+    cursor = _ler_cursor(apos)
+    if cursor is not None:
+        inscricoes = inscricoes.filter(id__gt=cursor)
+
+    # Um item a mais indica se existe outra página
+    itens = list(inscricoes.select_related('usuario').order_by('id')[:TAMANHO_PAGINA + 1])
+    tem_mais = len(itens) > TAMANHO_PAGINA
+    itens = itens[:TAMANHO_PAGINA]
+
+    proxima = None
+    if tem_mais:
+        proxima = '?' + urlencode({
+            **{chave: valor for chave, valor in filtros.items() if valor},
+            'apos': itens[-1].id,
+        })
+
+    return {'inscricoes': itens, 'total': total, 'proxima': proxima}
@@ -0,0 +1,207 @@
+"""
+Check-in de presença em lote
+Recebe vários ids de inscrição ou identificadores lidos na portaria (usuário,
+email ou id do usuário) e aplica todos com um único UPDATE, gravando os logs
+de auditoria com um bulk_create, na mesma transação. Também atende o check-in
+offline da API: lista versionada para download e sincronização em lote.
+"""
+import hashlib
+import re
+from django.db import transaction
+from django.db.models import F, Q
+from .models import Inscricao
+
+
+def ler_identificadores(texto):
+    """Separa o texto lido (um por linha, ou por vírgula/espaço) em identificadores"""
+    return [item for item in re.split(r'[\s,;]+', texto or '') if item]
+
+
+def registrar_presencas(evento, responsavel, inscricao_ids=(), identificadores=(), presenca=True, request=None):
+    """
+    Confirma (ou remove, com presenca=False) a presença de várias inscrições
+
+    Só as inscrições confirmadas do evento cuja presença muda são alteradas e
+    auditadas. Retorna um dicionário com `alteradas`, `sem_alteracao` e
+    `nao_encontrados` (ids e identificadores que não correspondem a inscrições).
+    """
+    from auditoria.models import LogAuditoria
+
+    ids = {int(valor) for valor in inscricao_ids if str(valor).isdigit()}
+    identificadores = list(dict.fromkeys(identificadores))
+    numericos = [int(valor) for valor in identificadores if valor.isdigit()]
+
+    filtro = Q(id__in=ids) | Q(usuario__username__in=identificadores) | Q(usuario__email__in=identificadores)
+    if numericos:
+        filtro |= Q(usuario_id__in=numericos)
+
+    with transaction.atomic():
+        encontradas = list(
+            Inscricao.objects.filter(evento=evento, status='CONFIRMADA')
+            .filter(filtro)
+            .select_related('usuario')
+            .select_for_update()
+        )
+
+        alterar = [inscricao for inscricao in encontradas if inscricao.presenca_confirmada != presenca]
+        if alterar:
+            Inscricao.objects.filter(
+                id__in=[inscricao.id for inscricao in alterar],
+                presenca_confirmada=not presenca
+            ).update(presenca_confirmada=presenca, presenca_versao=F('presenca_versao') + 1)
+
+            acao = 'confirmar_presenca' if presenca else 'remover_presenca'
+            titulo = 'Presença confirmada' if presenca else 'Presença removida'
+            LogAuditoria.objects.bulk_create([
+                LogAuditoria.montar(
+                    usuario=responsavel,
+                    acao='INSCRICAO_EVENTO',
+                    descricao=f'{titulo}: {inscricao.usuario.get_full_name()} - {evento.titulo}',
+                    request=request,
+                    dados_adicionais={
+                        'inscricao_id': inscricao.id,
+                        'evento_id': evento.id,
+                        'usuario_id': inscricao.usuario_id,
+                        'acao': acao,
+                        'lote': True
+                    }
+                )
+                for inscricao in alterar
+            ])
+
+    ids_encontrados = {inscricao.id for inscricao in encontradas}
+    reconhecidos = set()
+    for inscricao in encontradas:
+        reconhecidos.update({inscricao.usuario.username, inscricao.usuario.email, str(inscricao.usuario_id)})
+
+    nao_encontrados = [str(valor) for valor in sorted(ids - ids_encontrados)]
+    nao_encontrados += [valor for valor in identificadores if valor not in reconhecidos]
+
+    return {
+        'alteradas': len(alterar),
+        'sem_alteracao': len(encontradas) - len(alterar),
+        'nao_encontrados': nao_encontrados,
+    }
+
+
+# Check-in offline: a equipe baixa a lista, marca presenças sem rede e sincroniza depois
+
+CAMPOS_LISTA_CHECKIN = ['inscricao_id', 'nome', 'token', 'presenca', 'versao']
+
+TAMANHO_MAXIMO_SINCRONIZACAO = 1000
+
+
+def versao_lista_checkin(evento):
+    """
+    Versão da lista de check-in do evento
+
+    Resumo (hash) de cada linha confirmada: id da inscrição, versão da presença
+    e nome do participante. Muda quando alguém entra, sai ou volta para a
+    lista, quando qualquer presença muda ou quando um nome é alterado, e serve
+    de ETag para o aparelho evitar baixar de novo a mesma lista.
+    """
+    linhas = (
+        Inscricao.objects.filter(evento=evento, status='CONFIRMADA')
+        .order_by('id')
+        .values_list('id', 'presenca_versao', 'usuario__first_name', 'usuario__last_name', 'usuario__username')
+    )
+    resumo = hashlib.blake2b(digest_size=10)
+    for linha in linhas.iterator(chunk_size=2000):
+        resumo.update(repr(linha).encode('utf-8'))
+    return f'{evento.id}-{resumo.hexdigest()}'
+
+
+def lista_checkin(evento):
+    """Retorna a lista compacta de participantes confirmados, uma linha por inscrição"""
+    inscricoes = (
+        Inscricao.objects.filter(evento=evento, status='CONFIRMADA')
+        .select_related('usuario')
+        .only('id', 'evento_id', 'usuario_id', 'presenca_confirmada', 'presenca_versao',
+              'usuario__first_name', 'usuario__last_name', 'usuario__username')
+        .order_by('id')
+    )
+    return [
+        [
+            inscricao.id,
+            inscricao.usuario.get_full_name() or inscricao.usuario.username,
+            inscricao.token_checkin,
+            inscricao.presenca_confirmada,
+            inscricao.presenca_versao,
+        ]
+        for inscricao in inscricoes.iterator(chunk_size=2000)
+    ]
+
+
+def sincronizar_presencas(evento, responsavel, alteracoes, request=None):
+    """
+    Aplica um lote de presenças marcadas offline
+
+    Cada alteração tem `inscricao_id`, `presenca` e `versao` (a versão vista na
+    lista baixada). Reenviar o mesmo lote não tem efeito: presenças que já
+    estão no valor pedido entram em `ja_aplicadas`. Se a presença mudou no
+    servidor depois do download (versão diferente), a alteração não é aplicada
+    e volta em `conflitos` com o estado atual. Só as linhas alteradas são
+    gravadas, com um UPDATE por valor de presença e um bulk_create de logs.
+    """
+    from auditoria.models import LogAuditoria
+
+    # Se a mesma inscrição aparece mais de uma vez, vale a última marcação
+    pedidas = {}
+    for alteracao in alteracoes:
+        pedidas[alteracao['inscricao_id']] = alteracao
+
+    resultado = {'aplicadas': [], 'ja_aplicadas': [], 'conflitos': [], 'nao_encontradas': []}
+
+    with transaction.atomic():
+        atuais = {
+            inscricao.id: inscricao
+            for inscricao in Inscricao.objects.filter(
+                evento=evento, status='CONFIRMADA', id__in=list(pedidas)
+            ).select_related('usuario').select_for_update()
+        }
+
+        aplicar = {True: [], False: []}
+        for inscricao_id, alteracao in pedidas.items():
+            inscricao = atuais.get(inscricao_id)
+            if inscricao is None:
+                resultado['nao_encontradas'].append(inscricao_id)
+            elif inscricao.presenca_confirmada == alteracao['presenca']:
+                resultado['ja_aplicadas'].append(inscricao_id)
+            elif inscricao.presenca_versao != alteracao['versao']:
+                resultado['conflitos'].append({
+                    'inscricao_id': inscricao_id,
+                    'presenca': inscricao.presenca_confirmada,
+                    'versao': inscricao.presenca_versao,
+                })
+            else:
+                aplicar[alteracao['presenca']].append(inscricao)
+
+        logs = []
+        for presenca, inscricoes in aplicar.items():
+            if not inscricoes:
+                continue
+            Inscricao.objects.filter(
+                id__in=[inscricao.id for inscricao in inscricoes],
+                presenca_confirmada=not presenca
+            ).update(presenca_confirmada=presenca, presenca_versao=F('presenca_versao') + 1)
+
+            titulo = 'Presença confirmada' if presenca else 'Presença removida'
+            for inscricao in inscricoes:
+                resultado['aplicadas'].append(inscricao.id)
+                logs.append(LogAuditoria.montar(
+                    usuario=responsavel,
+                    acao='INSCRICAO_EVENTO',
+                    descricao=f'{titulo} (check-in offline): {inscricao.usuario.get_full_name()} - {evento.titulo}',
+                    request=request,
+                    dados_adicionais={
+                        'inscricao_id': inscricao.id,
+                        'evento_id': evento.id,
+                        'usuario_id': inscricao.usuario_id,
+                        'acao': 'confirmar_presenca' if presenca else 'remover_presenca',
+                        'offline': True
+                    }
+                ))
+
+        LogAuditoria.objects.bulk_create(logs)
+
+    return resultado
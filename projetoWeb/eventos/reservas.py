@@ -0,0 +1,177 @@
+"""
+Serviço de reserva de vagas
+Centraliza a criação/reativação de inscrições usada pelas views e pela API,
+garantindo que um evento nunca ultrapasse o número de vagas, e a promoção
+automática da lista de espera quando uma vaga é liberada
+"""
+import logging
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from .models import Evento, Inscricao, ListaEspera
+
+logger = logging.getLogger(__name__)
+
+
+class ReservaIndisponivel(Exception):
+    """Erro levantado quando não é possível reservar a vaga"""
+
+    def __init__(self, mensagem):
+        super().__init__(mensagem)
+        self.mensagem = mensagem
+
+
+class EventoLotado(ReservaIndisponivel):
+    """Erro levantado quando o evento está aberto, mas sem vagas"""
+
+    def __init__(self, mensagem='Não há vagas disponíveis para este evento.'):
+        super().__init__(mensagem)
+
+
+class SorteioPendente(ReservaIndisponivel):
+    """Erro levantado quando as vagas do evento ainda serão sorteadas"""
+
+    def __init__(self, mensagem='As vagas deste evento serão sorteadas. Registre seu interesse pelo site.'):
+        super().__init__(mensagem)
+
+
+def reservar_vaga(usuario, evento):
+    """
+    Reserva uma vaga para o usuário no evento
+
+    A vaga é ocupada com um único UPDATE condicional sobre o contador
+    `inscritos_confirmados`; se duas requisições disputam a última vaga,
+    apenas uma delas altera a linha. Qualquer erro posterior desfaz a reserva.
+
+    Retorna uma tupla (inscricao, reativada).
+    """
+    if usuario.is_organizador():
+        raise ReservaIndisponivel('Organizadores não podem se inscrever em eventos.')
+
+    if evento.usa_sorteio():
+        raise SorteioPendente()
+
+    try:
+        with transaction.atomic():
+            ocupadas = Evento.objects.filter(
+                pk=evento.pk,
+                status='ABERTO',
+                inscritos_confirmados__lt=F('vagas')
+            ).update(inscritos_confirmados=F('inscritos_confirmados') + 1)
+
+            if not ocupadas:
+                evento.refresh_from_db(fields=['status', 'inscritos_confirmados'])
+                if evento.status != 'ABERTO':
+                    raise ReservaIndisponivel('Este evento não está aberto para inscrições.')
+                raise EventoLotado()
+
+            inscricoes = Inscricao.objects.filter(usuario=usuario, evento=evento)
+
+            if inscricoes.filter(status='CONFIRMADA').exists():
+                # Desfaz o incremento do contador junto com a transação
+                raise ReservaIndisponivel('Você já está inscrito neste evento.')
+
+            inscricao = inscricoes.filter(status='CANCELADA').first()
+            if inscricao:
+                inscricao.status = 'CONFIRMADA'
+                inscricao.save(update_fields=['status'])
+                reativada = True
+            else:
+                inscricao = Inscricao.objects.create(
+                    usuario=usuario,
+                    evento=evento,
+                    status='CONFIRMADA'
+                )
+                reativada = False
+
+            # Quem consegue a vaga deixa de ocupar posição na fila
+            ListaEspera.objects.filter(usuario=usuario, evento=evento).delete()
+    except IntegrityError:
+        # Requisição simultânea do mesmo usuário: a restrição única barrou a duplicata
+        raise ReservaIndisponivel('Você já está inscrito neste evento.')
+
+    evento.refresh_from_db(fields=['inscritos_confirmados'])
+    return inscricao, reativada
+
+
+def entrar_lista_espera(usuario, evento):
+    """
+    Coloca o usuário no fim da fila de espera do evento
+
+    Retorna uma tupla (entrada, criada).
+    """
+    if usuario.is_organizador():
+        raise ReservaIndisponivel('Organizadores não podem se inscrever em eventos.')
+
+    if Inscricao.objects.filter(usuario=usuario, evento=evento, status='CONFIRMADA').exists():
+        raise ReservaIndisponivel('Você já está inscrito neste evento.')
+
+    return ListaEspera.objects.get_or_create(usuario=usuario, evento=evento)
+
+
+def promover_lista_espera(evento):
+    """
+    Promove o início da fila enquanto houver vagas livres
+
+    Deve ser chamada dentro da mesma transação que liberou a vaga. Cada
+    promovido recebe um único email, enviado após o commit.
+    Retorna a lista de inscrições criadas/reativadas.
+    """
+    from auditoria.models import LogAuditoria
+    from usuarios.email import enviar_email_vaga_lista_espera
+
+    promovidas = []
+
+    if evento.usa_sorteio():
+        return promovidas
+
+    with transaction.atomic():
+        fila = ListaEspera.objects.filter(evento=evento).select_related('usuario')
+
+        # A cabeça da fila sai a cada volta (promovida ou descartada)
+        while True:
+            entrada = fila.first()
+            if entrada is None:
+                break
+
+            try:
+                inscricao, _ = reservar_vaga(entrada.usuario, evento)
+            except EventoLotado:
+                break
+            except ReservaIndisponivel:
+                if evento.status != 'ABERTO':
+                    break
+                # Já inscrito por outro caminho: a entrada não tem mais utilidade
+                entrada.delete()
+                continue
+
+            LogAuditoria.registrar(
+                usuario=entrada.usuario,
+                acao='INSCRICAO_EVENTO',
+                descricao=f'Promovido da lista de espera no evento "{evento.titulo}"',
+                dados_adicionais={
+                    'evento_id': evento.id,
+                    'evento_titulo': evento.titulo,
+                    'inscricao_id': inscricao.id,
+                    'lista_espera': True
+                }
+            )
+            promovidas.append(inscricao)
+            logger.info(f'{entrada.usuario.get_full_name()} promovido da lista de espera - Evento: {evento.titulo}')
+
+        for inscricao in promovidas:
+            transaction.on_commit(lambda inscricao=inscricao: enviar_email_vaga_lista_espera(inscricao))
+
+    return promovidas
+
+
+def liberar_vaga(inscricao):
+    """
+    Cancela a inscrição e, na mesma transação, repassa a vaga para a fila
+
+    Retorna True se a inscrição estava confirmada e foi cancelada.
+    """
+    with transaction.atomic():
+        cancelada = inscricao.cancelar()
+        if cancelada:
+            promover_lista_espera(inscricao.evento)
+    return cancelada
@@ -0,0 +1,168 @@
+"""
+Alocação de vagas por sorteio
+Durante o período de interesse os alunos apenas registram uma intenção
+(um INSERT barato); depois um único sorteio em lote transforma as intenções
+sorteadas em inscrições e move as demais para a lista de espera ou as rejeita.
+Cada sorteado ganha um log de auditoria na mesma transação e um email, enviado
+após o commit.
+"""
+import random
+import secrets
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Evento, Inscricao, ListaEspera, IntencaoInscricao
+from .reservas import ReservaIndisponivel
+
+TAMANHO_LOTE = 500
+
+
+def registrar_intencao(usuario, evento):
+    """
+    Registra o interesse do usuário em um evento com sorteio
+
+    Retorna uma tupla (intencao, criada).
+    """
+    if usuario.is_organizador():
+        raise ReservaIndisponivel('Organizadores não podem se inscrever em eventos.')
+
+    if not evento.periodo_interesse_aberto():
+        raise ReservaIndisponivel('O período de registro de interesse para o sorteio está encerrado.')
+
+    return IntencaoInscricao.objects.get_or_create(usuario=usuario, evento=evento)
+
+
+def _em_lotes(ids):
+    for inicio in range(0, len(ids), TAMANHO_LOTE):
+        yield ids[inicio:inicio + TAMANHO_LOTE]
+
+
+def realizar_sorteio(evento, semente=None, lista_espera=True):
+    """
+    Sorteia as vagas livres do evento entre as intenções pendentes
+
+    A semente é gravada no evento para que o resultado possa ser auditado e
+    reproduzido. Os não sorteados vão para a lista de espera (na ordem do
+    sorteio) ou, com lista_espera=False, apenas ficam como NAO_SORTEADA. Os
+    sorteados recebem um único email, enviado após o commit.
+    Retorna uma tupla (sorteados, nao_sorteados).
+    """
+    from auditoria.models import LogAuditoria
+    from usuarios.email import enviar_emails_vaga_sorteada
+
+    if semente is None:
+        semente = secrets.randbits(63)
+
+    with transaction.atomic():
+        # Marca o sorteio como realizado; só uma execução consegue fazer isso
+        marcado = Evento.objects.filter(
+            pk=evento.pk,
+            modo_inscricao='SORTEIO',
+            sorteio_realizado_em__isnull=True
+        ).update(
+            sorteio_realizado_em=timezone.now(),
+            sorteio_semente=semente,
+            atualizado_em=timezone.now()
+        )
+
+        if not marcado:
+            raise ReservaIndisponivel('O sorteio deste evento já foi realizado.')
+
+        evento.refresh_from_db(fields=['vagas', 'inscritos_confirmados', 'sorteio_realizado_em', 'sorteio_semente'])
+
+        ja_confirmados = set(
+            Inscricao.objects.filter(evento=evento, status='CONFIRMADA').values_list('usuario_id', flat=True)
+        )
+        intencoes = [
+            (intencao_id, usuario_id)
+            for intencao_id, usuario_id in IntencaoInscricao.objects.filter(
+                evento=evento, status='PENDENTE'
+            ).order_by('id').values_list('id', 'usuario_id')
+            if usuario_id not in ja_confirmados
+        ]
+
+        random.Random(semente).shuffle(intencoes)
+
+        vagas_livres = max(evento.vagas - evento.inscritos_confirmados, 0)
+        sorteados = intencoes[:vagas_livres]
+        nao_sorteados = intencoes[vagas_livres:]
+
+        usuarios_sorteados = [usuario_id for _, usuario_id in sorteados]
+
+        # Quem já teve uma inscrição cancelada é reativado; os demais são criados
+        canceladas = dict(
+            Inscricao.objects.filter(
+                evento=evento, status='CANCELADA', usuario_id__in=usuarios_sorteados
+            ).values_list('usuario_id', 'id')
+        )
+        for lote in _em_lotes(list(canceladas.values())):
+            Inscricao.objects.filter(id__in=lote).update(status='CONFIRMADA')
+
+        Inscricao.objects.bulk_create(
+            [
+                Inscricao(usuario_id=usuario_id, evento=evento, status='CONFIRMADA')
+                for usuario_id in usuarios_sorteados
+                if usuario_id not in canceladas
+            ],
+            batch_size=TAMANHO_LOTE
+        )
+
+        Evento.objects.filter(pk=evento.pk).update(
+            inscritos_confirmados=F('inscritos_confirmados') + len(sorteados)
+        )
+
+        inscricoes_sorteadas = []
+        for lote in _em_lotes(usuarios_sorteados):
+            inscricoes_sorteadas += Inscricao.objects.filter(
+                evento=evento, status='CONFIRMADA', usuario_id__in=lote
+            ).select_related('usuario', 'evento')
+
+        LogAuditoria.objects.bulk_create(
+            [
+                LogAuditoria.montar(
+                    usuario=inscricao.usuario,
+                    acao='INSCRICAO_EVENTO',
+                    descricao=f'Sorteado para o evento "{evento.titulo}"',
+                    dados_adicionais={
+                        'evento_id': evento.id,
+                        'evento_titulo': evento.titulo,
+                        'inscricao_id': inscricao.id,
+                        'sorteio': True
+                    }
+                )
+                for inscricao in inscricoes_sorteadas
+            ],
+            batch_size=TAMANHO_LOTE
+        )
+
+        for lote in _em_lotes([intencao_id for intencao_id, _ in sorteados]):
+            IntencaoInscricao.objects.filter(id__in=lote).update(status='SORTEADA')
+        for lote in _em_lotes([intencao_id for intencao_id, _ in nao_sorteados]):
+            IntencaoInscricao.objects.filter(id__in=lote).update(status='NAO_SORTEADA')
+
+        if lista_espera:
+            # A ordem do bulk_create (ids crescentes) preserva a ordem do sorteio
+            ListaEspera.objects.bulk_create(
+                [ListaEspera(usuario_id=usuario_id, evento=evento) for _, usuario_id in nao_sorteados],
+                batch_size=TAMANHO_LOTE,
+                ignore_conflicts=True
+            )
+
+        LogAuditoria.registrar(
+            usuario=None,  # Sistema
+            acao='INSCRICAO_EVENTO',
+            descricao=f'Sorteio de vagas realizado para o evento "{evento.titulo}"',
+            dados_adicionais={
+                'evento_id': evento.id,
+                'evento_titulo': evento.titulo,
+                'semente': semente,
+                'sorteados': len(sorteados),
+                'nao_sorteados': len(nao_sorteados),
+                'lista_espera': lista_espera
+            }
+        )
+
+        transaction.on_commit(lambda: enviar_emails_vaga_sorteada(inscricoes_sorteadas))
+
+    evento.refresh_from_db(fields=['inscritos_confirmados'])
+    return len(sorteados), len(nao_sorteados)
@@ -0,0 +1,297 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+import threading
+import time
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from eventos.models import Evento, Inscricao, IntencaoInscricao, ListaEspera
+from eventos.presencas import versao_lista_checkin
+from eventos.reservas import reservar_vaga, ReservaIndisponivel
+from eventos.sorteio import realizar_sorteio
+from auditoria.models import LogAuditoria
+
+Usuario = get_user_model()
+
+
+def criar_organizador(username='organizador'):
+    return Usuario.objects.create_user(
+        username=username,
+        perfil='ORGANIZADOR',
+        telefone='11999999999',
+        instituicao_ensino='Teste'
+    )
+
+
+def criar_aluno(username, **campos):
+    return Usuario.objects.create_user(
+        username=username,
+        perfil='ALUNO',
+        telefone='11999999999',
+        instituicao_ensino='Teste',
+        **campos
+    )
+
+
+def criar_evento(organizador, **campos):
+    """Evento aberto hoje, com 10 vagas; `campos` substitui qualquer valor"""
+    hoje = timezone.now().date()
+    return Evento.objects.create(**{
+        'tipo': 'PALESTRA',
+        'titulo': 'Evento de teste',
+        'descricao': 'Evento criado pelos testes',
+        'data_inicio': hoje,
+        'data_fim': hoje,
+        'horario': '08:00',
+        'local': 'Teste',
+        'vagas': 10,
+        'organizador': organizador,
+        'status': 'ABERTO',
+        **campos
+    })
+
+
+class ReservaConcorrenteTests(TransactionTestCase):
+    """Inscrições simultâneas nunca ultrapassam as vagas do evento"""
+
+    VAGAS = 20
+    USUARIOS = 100
+    THREADS = 16
+
+    def setUp(self):
+        self.evento = criar_evento(criar_organizador(), tipo='MINICURSO', vagas=self.VAGAS)
+        Usuario.objects.bulk_create([
+            Usuario(
+                username=f'aluno{i}',
+                perfil='ALUNO',
+                telefone='11999999999',
+                instituicao_ensino='Teste'
+            )
+            for i in range(self.USUARIOS)
+        ])
+        self.usuarios = list(Usuario.objects.filter(perfil='ALUNO'))
+
+    def inscrever(self, usuario, largada):
+        largada.wait()
+        try:
+            # O banco de teste do SQLite (em memória) recusa escritas simultâneas com
+            # "table is locked" em vez de esperar; como um cliente, tenta de novo
+            for _ in range(200):
+                try:
+                    reservar_vaga(usuario, self.evento)
+                    return 'ok'
+                except OperationalError:
+                    time.sleep(0.01)
+            return 'erro'
+        except ReservaIndisponivel:
+            return 'recusada'
+        finally:
+            connection.close()
+
+    def test_inscricoes_simultaneas_ocupam_exatamente_as_vagas(self):
+        largada = threading.Event()
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            futuros = [executor.submit(self.inscrever, usuario, largada) for usuario in self.usuarios]
+            largada.set()
+            resultados = [futuro.result() for futuro in futuros]
+
+        # O resultado vale pelo banco: uma reserva gravada cuja leitura seguinte deu
+        # "locked" é repetida pelo cliente e volta como "já inscrito"
+        self.evento.refresh_from_db(fields=['inscritos_confirmados'])
+        confirmadas = Inscricao.objects.filter(evento=self.evento, status='CONFIRMADA')
+        self.assertNotIn('erro', resultados)
+        self.assertEqual(confirmadas.count(), self.VAGAS)
+        self.assertEqual(confirmadas.values('usuario').distinct().count(), self.VAGAS)
+        self.assertEqual(self.evento.inscritos_confirmados, self.VAGAS)
+
+
+# Sem a varredura de certificados, que o middleware dispararia na primeira requisição
+@override_settings(CERTIFICADOS_VARREDURA_AUTOMATICA=False)
+class DetalhesEventoConsultasTests(TestCase):
+    """detalhes_evento usa um número fixo de consultas, qualquer que seja o número de inscritos"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizador = criar_organizador()
+        cls.aluno = criar_aluno('aluno')
+        Usuario.objects.bulk_create([
+            Usuario(
+                username=f'participante{i}',
+                first_name='Participante',
+                last_name=str(i),
+                perfil='ALUNO',
+                telefone='11999999999',
+                instituicao_ensino='Teste'
+            )
+            for i in range(300)
+        ])
+        participantes = list(Usuario.objects.filter(first_name='Participante').order_by('id'))
+
+        cls.pequeno = cls.criar_evento_lotado('Evento pequeno', participantes[:1])
+        cls.grande = cls.criar_evento_lotado('Evento grande', participantes)
+        ListaEspera.objects.create(usuario=cls.aluno, evento=cls.grande)
+
+    @classmethod
+    def criar_evento_lotado(cls, titulo, participantes):
+        evento = criar_evento(cls.organizador, titulo=titulo, vagas=len(participantes))
+        Inscricao.objects.bulk_create([
+            Inscricao(usuario=usuario, evento=evento, status='CONFIRMADA')
+            for usuario in participantes
+        ])
+        evento.incrementar_inscritos(len(participantes))
+        return evento
+
+    def detalhes(self, usuario, evento, consultas):
+        self.client.force_login(usuario)
+        # Sessão e usuário autenticado entram na conta
+        with self.assertNumQueries(consultas):
+            resposta = self.client.get(reverse('detalhes_evento', args=[evento.id]))
+        self.assertEqual(resposta.status_code, 200)
+        return resposta
+
+    def test_organizador(self):
+        for evento in (self.pequeno, self.grande):
+            with self.subTest(evento=evento.titulo):
+                resposta = self.detalhes(self.organizador, evento, 5)
+                self.assertIsNotNone(resposta.context['participantes'])
+
+    def test_aluno(self):
+        for evento, posicao in ((self.pequeno, None), (self.grande, 1)):
+            with self.subTest(evento=evento.titulo):
+                resposta = self.detalhes(self.aluno, evento, 3)
+                self.assertEqual(resposta.context['posicao_lista_espera'], posicao)
+
+
+class VersaoListaCheckinTests(TestCase):
+    """A versão da lista de check-in muda sempre que o conteúdo da lista muda"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.evento = criar_evento(criar_organizador())
+        cls.inscricoes = [
+            Inscricao.objects.create(
+                usuario=criar_aluno(f'aluno{i}', first_name='Aluno', last_name=str(i)),
+                evento=cls.evento,
+                status='CANCELADA' if i == 0 else 'CONFIRMADA'
+            )
+            for i in range(3)
+        ]
+
+    def test_cancelar_e_reativar_outra_inscricao(self):
+        # Mesmo total, mesmo maior id e mesma soma de versões: só os ids mudam
+        primeira, segunda, _ = self.inscricoes
+        versao = versao_lista_checkin(self.evento)
+        Inscricao.objects.filter(pk=segunda.pk).update(status='CANCELADA')
+        Inscricao.objects.filter(pk=primeira.pk).update(status='CONFIRMADA')
+        self.assertNotEqual(versao_lista_checkin(self.evento), versao)
+
+    def test_alterar_nome(self):
+        versao = versao_lista_checkin(self.evento)
+        usuario = self.inscricoes[1].usuario
+        usuario.first_name = 'Outro'
+        usuario.save()
+        self.assertNotEqual(versao_lista_checkin(self.evento), versao)
+
+    def test_alterar_presenca(self):
+        versao = versao_lista_checkin(self.evento)
+        self.inscricoes[1].definir_presenca(True)
+        self.assertNotEqual(versao_lista_checkin(self.evento), versao)
+
+    def test_sem_alteracao(self):
+        self.assertEqual(versao_lista_checkin(self.evento), versao_lista_checkin(self.evento))
+
+
+class SorteioTests(TestCase):
+    """O sorteio acontece uma única vez e avisa cada sorteado"""
+
+    VAGAS = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.evento = criar_evento(
+            criar_organizador(),
+            tipo='MINICURSO',
+            vagas=cls.VAGAS,
+            modo_inscricao='SORTEIO',
+            sorteio_encerramento=timezone.now() - timedelta(hours=1)
+        )
+        for i in range(10):
+            aluno = criar_aluno(f'aluno{i}', email=f'aluno{i}@teste.com')
+            IntencaoInscricao.objects.create(usuario=aluno, evento=cls.evento)
+
+    def test_save_com_instancia_antiga_nao_desfaz_o_sorteio(self):
+        antiga = Evento.objects.get(pk=self.evento.pk)
+        realizar_sorteio(self.evento, semente=42)
+
+        antiga.descricao = 'Descrição editada'
+        antiga.save()
+
+        self.evento.refresh_from_db()
+        self.assertIsNotNone(self.evento.sorteio_realizado_em)
+        self.assertEqual(self.evento.sorteio_semente, 42)
+        self.assertEqual(self.evento.inscritos_confirmados, self.VAGAS)
+        with self.assertRaises(ReservaIndisponivel):
+            realizar_sorteio(self.evento)
+
+    def test_sorteados_recebem_email_apos_o_commit_e_log(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            sorteados, nao_sorteados = realizar_sorteio(self.evento, semente=42)
+            self.assertEqual(len(mail.outbox), 0)
+
+        self.assertEqual((sorteados, nao_sorteados), (self.VAGAS, 10 - self.VAGAS))
+        self.assertEqual(len(callbacks), 1)
+
+        confirmadas = Inscricao.objects.filter(evento=self.evento, status='CONFIRMADA')
+        emails = {usuario.email for usuario in Usuario.objects.filter(inscricoes__in=confirmadas)}
+        self.assertEqual({destinatario for email in mail.outbox for destinatario in email.to}, emails)
+        self.assertEqual(len(mail.outbox), self.VAGAS)
+
+        logs = LogAuditoria.objects.filter(dados_adicionais__sorteio=True)
+        self.assertEqual(
+            set(logs.values_list('usuario_id', flat=True)),
+            set(confirmadas.values_list('usuario_id', flat=True))
+        )
+
+
+class ReconciliarInscritosTests(TestCase):
+    """reconciliar_inscritos corrige o contador com a contagem feita no próprio UPDATE"""
+
+    @classmethod
+    def setUpTestData(cls):
+        organizador = criar_organizador()
+        cls.divergente = criar_evento(organizador, titulo='Contador divergente')
+        cls.vazio = criar_evento(organizador, titulo='Sem inscrições')
+        for i in range(3):
+            Inscricao.objects.create(usuario=criar_aluno(f'aluno{i}'), evento=cls.divergente, status='CONFIRMADA')
+        Inscricao.objects.create(usuario=criar_aluno('cancelado'), evento=cls.divergente, status='CANCELADA')
+        Evento.objects.filter(pk=cls.divergente.pk).update(inscritos_confirmados=7)
+        Evento.objects.filter(pk=cls.vazio.pk).update(inscritos_confirmados=2)
+
+    def test_corrige_divergencias(self):
+        call_command('reconciliar_inscritos', stdout=StringIO())
+
+        self.divergente.refresh_from_db()
+        self.vazio.refresh_from_db()
+        self.assertEqual(self.divergente.inscritos_confirmados, 3)
+        self.assertEqual(self.vazio.inscritos_confirmados, 0)
+
+    def test_reserva_entre_a_leitura_e_a_correcao_nao_se_perde(self):
+        evento = self.divergente
+
+        class SaidaComReserva(StringIO):
+            """Confirma uma reserva logo depois que o comando lê o evento divergente"""
+
+            def write(self, texto):
+                if evento.titulo in texto:
+                    reservar_vaga(criar_aluno('atrasado'), evento)
+                return super().write(texto)
+
+        call_command('reconciliar_inscritos', stdout=SaidaComReserva())
+
+        evento.refresh_from_db()
+        self.assertEqual(evento.inscritos_confirmados, 4)
@@ -8,6 +8,9 @@ urlpatterns = [
     path('<int:pk>/editar/', views.editar_evento, name='editar_evento'),
     path('<int:pk>/excluir/', views.excluir_evento, name='excluir_evento'),
     path('<int:pk>/inscrever/', views.inscrever_evento, name='inscrever_evento'),
+    path('<int:pk>/participantes/', views.participantes_evento, name='participantes_evento'),
+    path('<int:pk>/presencas/', views.checkin_presencas, name='checkin_presencas'),
+    path('<int:pk>/lista-espera/sair/', views.sair_lista_espera, name='sair_lista_espera'),
     path('minhas-inscricoes/', views.minhas_inscricoes, name='minhas_inscricoes'),
     path('inscricao/<int:inscricao_id>/cancelar/', views.cancelar_inscricao, name='cancelar_inscricao'),
     path('inscricao/<int:inscricao_id>/confirmar-presenca/', views.confirmar_presenca, name='confirmar_presenca'),
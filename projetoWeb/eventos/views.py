@@ -2,13 +2,40 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.exceptions import ValidationError
-from .models import Evento, Inscricao
+from django.http import JsonResponse
+from django.template.loader import render_to_string
+from .models import Evento, Inscricao, ListaEspera
 from .forms import EventoForm
+from .reservas import (
+    reservar_vaga, entrar_lista_espera, liberar_vaga, promover_lista_espera,
+    ReservaIndisponivel, EventoLotado
+)
+from .sorteio import registrar_intencao
+from .detalhes import contexto_detalhes
+from .presencas import registrar_presencas, ler_identificadores
+from . import listagem, participantes
 
 @login_required
 def listar_eventos(request):
-    eventos = Evento.objects.all()
-    return render(request, 'listar_eventos.html', {'eventos': eventos})
+    filtros = listagem.ler_filtros(request.GET)
+    resultado = listagem.pagina(
+        filtros,
+        apos=request.GET.get('apos'),
+        antes=request.GET.get('antes')
+    )
+
+    context = {
+        'eventos': resultado['eventos'],
+        'proxima': resultado['proxima'],
+        'anterior': resultado['anterior'],
+        'limite_busca': resultado['limite_busca'],
+        'facetas': listagem.facetas(filtros),
+        'filtros': filtros,
+        'busca': filtros['q'],
+        'tipos': Evento.TIPO_CHOICES,
+        'status_choices': Evento.STATUS_CHOICES,
+    }
+    return render(request, 'listar_eventos.html', context)
 
 @login_required
 def criar_evento(request):
@@ -75,6 +102,9 @@ def editar_evento(request, pk):
                 evento.full_clean()  # Executa validações do modelo
                 evento.save()
 
+                # Se o número de vagas aumentou, a fila de espera é promovida
+                promover_lista_espera(evento)
+
                 # Registra log de auditoria
                 from auditoria.models import LogAuditoria
                 LogAuditoria.registrar(
@@ -129,27 +159,28 @@ def excluir_evento(request, pk):
 
 @login_required
 def detalhes_evento(request, pk):
-    evento = get_object_or_404(Evento, pk=pk)
-    inscrito = False
+    context = contexto_detalhes(pk, request.user, request.GET)
+    return render(request, 'detalhes_evento.html', context)
 
-    if not request.user.is_organizador():
-        inscrito = Inscricao.objects.filter(
-            usuario=request.user,
-            evento=evento,
-            status='CONFIRMADA'
-        ).exists()
+@login_required
+def participantes_evento(request, pk):
+    """Página de participantes do evento, carregada sob demanda pela página de detalhes"""
+    evento = get_object_or_404(Evento, pk=pk)
 
-    inscritos = evento.inscricoes.filter(status='CONFIRMADA') if request.user.is_organizador() else None
+    if evento.organizador_id != request.user.id and not request.user.is_organizador():
+        return JsonResponse({'erro': 'Acesso negado'}, status=403)
 
-    context = {
-        'evento': evento,
-        'inscrito': inscrito,
-        'inscritos': inscritos,
-        'pode_inscrever': evento.pode_inscrever(request.user) and evento.esta_aberto(),
-    }
+    resultado = participantes.pagina(
+        evento,
+        participantes.ler_filtros(request.GET),
+        apos=request.GET.get('apos')
+    )
 
-    context['inscricoes'] = evento.inscricoes.filter(status='CONFIRMADA') if request.user.perfil == 'ORGANIZADOR' or evento.organizador == request.user else None
-    return render(request, 'detalhes_evento.html', context)
+    return JsonResponse({
+        'html': render_to_string('participantes_linhas.html', {'inscricoes': resultado['inscricoes']}, request=request),
+        'total': resultado['total'],
+        'proxima': resultado['proxima'],
+    })
 
 @login_required
 def inscrever_evento(request, pk):
@@ -159,7 +190,7 @@ def inscrever_evento(request, pk):
         messages.error(request, 'Organizadores não podem se inscrever em eventos.')
         return redirect('detalhes_evento', pk=pk)
 
-    if not evento.esta_aberto():
+    if evento.status != 'ABERTO':
         messages.error(request, 'Este evento não está disponível para inscrições.')
         return redirect('detalhes_evento', pk=pk)
 
@@ -167,25 +198,39 @@ def inscrever_evento(request, pk):
         messages.error(request, 'Você já está inscrito neste evento.')
         return redirect('detalhes_evento', pk=pk)
 
-    # Verifica se há vagas disponíveis
-    if evento.vagas_disponiveis <= 0:
-        messages.error(request, 'Não há vagas disponíveis para este evento.')
+    # Eventos com sorteio apenas registram a intenção durante o período de interesse
+    if evento.usa_sorteio():
+        try:
+            _, criada = registrar_intencao(request.user, evento)
+        except ReservaIndisponivel as e:
+            messages.error(request, e.mensagem)
+            return redirect('detalhes_evento', pk=pk)
+
+        if criada:
+            messages.success(request, 'Interesse registrado! As vagas serão sorteadas ao fim do período de inscrição.')
+        else:
+            messages.info(request, 'Seu interesse neste evento já está registrado para o sorteio.')
         return redirect('detalhes_evento', pk=pk)
 
-    # Verifica se existe uma inscrição cancelada e reativa
-    inscricao_cancelada = Inscricao.objects.filter(
-        usuario=request.user,
-        evento=evento,
-        status='CANCELADA'
-    ).first()
-
-    if inscricao_cancelada:
-        inscricao_cancelada.status = 'CONFIRMADA'
-        inscricao_cancelada.save()
-        inscricao = inscricao_cancelada
+    # Ocupa a vaga de forma atômica (não depende das verificações acima)
+    try:
+        inscricao, reativada = reservar_vaga(request.user, evento)
+    except EventoLotado:
+        # Sem vagas: o usuário entra na fila e é promovido automaticamente
+        entrada, _ = entrar_lista_espera(request.user, evento)
+        messages.info(
+            request,
+            f'Não há vagas no momento. Você está na lista de espera (posição {entrada.posicao()}) '
+            'e será inscrito automaticamente quando uma vaga for liberada.'
+        )
+        return redirect('detalhes_evento', pk=pk)
+    except ReservaIndisponivel as e:
+        messages.error(request, e.mensagem)
+        return redirect('detalhes_evento', pk=pk)
+
+    if reativada:
         mensagem = 'Inscrição reativada com sucesso!'
     else:
-        inscricao = Inscricao.objects.create(usuario=request.user, evento=evento)
         mensagem = 'Inscrição realizada com sucesso! Verifique seu email.'
 
     # Registra log de auditoria
@@ -219,12 +264,22 @@ def cancelar_inscricao(request, inscricao_id):
         messages.error(request, 'Você não tem permissão para cancelar esta inscrição.')
         return redirect('minhas_inscricoes')
 
-    inscricao.status = 'CANCELADA'
-    inscricao.save()
+    # Cancela e promove o próximo da lista de espera na mesma transação
+    liberar_vaga(inscricao)
 
     messages.success(request, 'Inscrição cancelada com sucesso!')
     return redirect('minhas_inscricoes')
 
+@login_required
+def sair_lista_espera(request, pk):
+    evento = get_object_or_404(Evento, pk=pk)
+
+    if request.method == 'POST':
+        ListaEspera.objects.filter(usuario=request.user, evento=evento).delete()
+        messages.success(request, 'Você saiu da lista de espera.')
+
+    return redirect('detalhes_evento', pk=pk)
+
 @login_required
 def minhas_inscricoes(request):
     if request.user.is_organizador():
@@ -234,6 +289,42 @@ def minhas_inscricoes(request):
     inscricoes = Inscricao.objects.filter(usuario=request.user).exclude(status='CANCELADA')
     return render(request, 'minhas_inscricoes.html', {'inscricoes': inscricoes})
 
+@login_required
+def checkin_presencas(request, pk):
+    """Confirma ou remove a presença de vários participantes de uma vez"""
+    evento = get_object_or_404(Evento, pk=pk)
+
+    if evento.organizador_id != request.user.id and not request.user.is_organizador():
+        messages.error(request, 'Apenas o organizador pode confirmar presenças.')
+        return redirect('detalhes_evento', pk=pk)
+
+    if request.method != 'POST':
+        return redirect('detalhes_evento', pk=pk)
+
+    presenca = request.POST.get('acao') != 'remover'
+    resultado = registrar_presencas(
+        evento,
+        request.user,
+        inscricao_ids=request.POST.getlist('inscricoes'),
+        identificadores=ler_identificadores(request.POST.get('identificadores')),
+        presenca=presenca,
+        request=request
+    )
+
+    if presenca:
+        messages.success(request, f'Presença confirmada para {resultado["alteradas"]} participante(s).')
+    else:
+        messages.warning(request, f'Presença removida para {resultado["alteradas"]} participante(s).')
+    if resultado['sem_alteracao']:
+        messages.info(request, f'{resultado["sem_alteracao"]} participante(s) já estavam nessa situação.')
+    if resultado['nao_encontrados']:
+        messages.error(
+            request,
+            'Não encontrados entre os inscritos: ' + ', '.join(resultado['nao_encontrados'][:20])
+        )
+
+    return redirect('detalhes_evento', pk=pk)
+
 @login_required
 def confirmar_presenca(request, inscricao_id):
     """Confirma a presença de um participante no evento"""
@@ -245,8 +336,7 @@ def confirmar_presenca(request, inscricao_id):
         return redirect('detalhes_evento', pk=inscricao.evento.pk)
 
     # Confirma a presença
-    inscricao.presenca_confirmada = True
-    inscricao.save()
+    inscricao.definir_presenca(True)
 
     # Registra log de auditoria
     from auditoria.models import LogAuditoria
@@ -277,8 +367,7 @@ def remover_presenca(request, inscricao_id):
         return redirect('detalhes_evento', pk=inscricao.evento.pk)
 
     # Remove a presença
-    inscricao.presenca_confirmada = False
-    inscricao.save()
+    inscricao.definir_presenca(False)
 
     # Registra log de auditoria
     from auditoria.models import LogAuditoria
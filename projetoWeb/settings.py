@@ -86,11 +86,15 @@ TIME_ZONE = 'America/Sao_Paulo'
 USE_I18N = True
 USE_TZ = True
 
-# Cache Configuration (para middleware de certificados)
+# Cache Configuration (middleware de certificados e fragmentos de templates)
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'sgea-cache',
+        'OPTIONS': {
+            # Comporta os fragmentos de cards de eventos (um por versão do evento)
+            'MAX_ENTRIES': 5000,
+        },
     }
 }
 
@@ -122,6 +126,8 @@ REST_FRAMEWORK = {
         'user': '1000/day',
         'eventos_consulta': '20/day',
         'eventos_inscricao': '50/day',
+        'checkin': '600/hour',
+        'validacao_certificados': '120/hour',
     },
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
@@ -141,6 +147,29 @@ DEFAULT_FROM_EMAIL = 'noreply@eventify.com'
 # URL Base do Sistema (para links em emails)
 BASE_URL = 'http://localhost:8000'
 
+# Geração automática de certificados pelo middleware, em segundo plano. Desligue
+# (False) se rodar `gerar_certificados --intervalo` como processo separado
+CERTIFICADOS_VARREDURA_AUTOMATICA = True
+
+# Máximo de páginas do PDF único de impressão. Ele só começa a ser enviado depois
+# de desenhado por inteiro; eventos maiores usam o ZIP, enviado enquanto é montado
+CERTIFICADOS_IMPRESSAO_MAXIMO = 500
+
+# Logs de auditoria de consultas gravados em lote por uma thread (False: grava na hora)
+AUDITORIA_GRAVACAO_EM_LOTE = True
+
+# Retenção dos logs de auditoria: `arquivar_logs` move os mais antigos que
+# AUDITORIA_RETENCAO_DIAS para arquivos .jsonl.gz diários neste diretório
+# (fora do git, ver projetoWeb/arquivo_auditoria/.gitignore: guardam IPs e navegadores)
+AUDITORIA_RETENCAO_DIAS = 90
+AUDITORIA_ARQUIVO_DIR = BASE_DIR / 'projetoWeb' / 'arquivo_auditoria'
+
+# Modelo dos certificados (opcionais: caminhos de arte de fundo, logo e fonte TTF)
+CERTIFICADO_FUNDO = None
+CERTIFICADO_LOGO = None
+CERTIFICADO_FONTE = None
+CERTIFICADO_INSTITUICAO = ''
+
 # Logging Configuration
 LOGGING = {
     'version': 1,
@@ -160,5 +189,15 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'certificados.varredura': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'auditoria.gravador': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
\ No newline at end of file
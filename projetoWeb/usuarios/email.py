@@ -1,4 +1,4 @@
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.utils.html import strip_tags
@@ -87,9 +87,9 @@ def enviar_email_inscricao_confirmada(inscricao):
         return False
 
 
-def enviar_email_certificado_disponivel(certificado):
+def montar_email_certificado_disponivel(certificado):
     """
-    Envia email notificando que o certificado está disponível
+    Monta (sem enviar) o email notificando que o certificado está disponível
     """
     usuario = certificado.inscricao.usuario
     evento = certificado.inscricao.evento
@@ -116,6 +116,14 @@ def enviar_email_certificado_disponivel(certificado):
     )
 
     email.attach_alternative(html_content, "text/html")
+    return email
+
+
+def enviar_email_certificado_disponivel(certificado):
+    """
+    Envia email notificando que o certificado está disponível
+    """
+    email = montar_email_certificado_disponivel(certificado)
 
     try:
         email.send()
@@ -123,3 +131,115 @@ def enviar_email_certificado_disponivel(certificado):
     except Exception as e:
         print(f"Erro ao enviar email: {e}")
         return False
+
+
+def enviar_emails_certificado_disponivel(certificados):
+    """
+    Envia em lote os emails de certificado disponível, por uma única conexão
+
+    Retorna a lista dos certificados cujo email foi entregue ao servidor.
+    """
+    entregues = []
+    try:
+        with get_connection() as conexao:
+            for certificado in certificados:
+                email = montar_email_certificado_disponivel(certificado)
+                email.connection = conexao
+                try:
+                    email.send()
+                    entregues.append(certificado)
+                except Exception as e:
+                    print(f"Erro ao enviar email: {e}")
+    except Exception as e:
+        print(f"Erro ao conectar ao servidor de email: {e}")
+    return entregues
+
+
+def enviar_email_vaga_lista_espera(inscricao):
+    """
+    Envia email avisando que o usuário saiu da lista de espera e foi inscrito
+    """
+    usuario = inscricao.usuario
+    evento = inscricao.evento
+
+    context = {
+        'usuario': usuario,
+        'nome_completo': usuario.get_full_name(),
+        'evento': evento,
+        'inscricao': inscricao,
+        'base_url': settings.BASE_URL,
+    }
+
+    html_content = render_to_string('emails/vaga_lista_espera.html', context)
+    text_content = strip_tags(html_content)
+
+    subject = f'Vaga liberada - {evento.titulo}'
+
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=text_content,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[usuario.email]
+    )
+
+    email.attach_alternative(html_content, "text/html")
+
+    try:
+        email.send()
+        return True
+    except Exception as e:
+        print(f"Erro ao enviar email: {e}")
+        return False
+
+
+def montar_email_vaga_sorteada(inscricao):
+    """
+    Monta (sem enviar) o email avisando que o usuário foi sorteado e está inscrito
+    """
+    usuario = inscricao.usuario
+    evento = inscricao.evento
+
+    context = {
+        'usuario': usuario,
+        'nome_completo': usuario.get_full_name(),
+        'evento': evento,
+        'inscricao': inscricao,
+        'base_url': settings.BASE_URL,
+    }
+
+    html_content = render_to_string('emails/vaga_sorteada.html', context)
+    text_content = strip_tags(html_content)
+
+    subject = f'Vaga sorteada - {evento.titulo}'
+
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=text_content,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[usuario.email]
+    )
+
+    email.attach_alternative(html_content, "text/html")
+    return email
+
+
+def enviar_emails_vaga_sorteada(inscricoes):
+    """
+    Envia em lote os emails dos sorteados, por uma única conexão
+
+    Retorna a lista das inscrições cujo email foi entregue ao servidor.
+    """
+    entregues = []
+    try:
+        with get_connection() as conexao:
+            for inscricao in inscricoes:
+                email = montar_email_vaga_sorteada(inscricao)
+                email.connection = conexao
+                try:
+                    email.send()
+                    entregues.append(inscricao)
+                except Exception as e:
+                    print(f"Erro ao enviar email: {e}")
+    except Exception as e:
+        print(f"Erro ao conectar ao servidor de email: {e}")
+    return entregues
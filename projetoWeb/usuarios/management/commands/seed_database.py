@@ -188,6 +188,7 @@ class Command(BaseCommand):
                         evento=evento,
                         status='CONFIRMADA'
                     )
+                    evento.incrementar_inscritos()
                     self.stdout.write(self.style.SUCCESS(f'  → Aluno inscrito em: {evento.titulo}'))
             else:
                 self.stdout.write(self.style.WARNING(f'- Evento já existe: {evento_data["titulo"]}'))
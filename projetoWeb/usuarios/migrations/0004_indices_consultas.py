@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-18 03:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("usuarios", "0003_alter_usuario_telefone"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="usuario",
+            name="codigo_confirmacao",
+            field=models.CharField(
+                blank=True, db_index=True, max_length=100, null=True
+            ),
+        ),
+    ]
@@ -20,7 +20,7 @@ class Usuario(AbstractUser):
     perfil = models.CharField(max_length=20, choices=PERFIL_CHOICES)
     data_cadastro = models.DateTimeField(auto_now_add=True)
     email_confirmado = models.BooleanField(default=False)
-    codigo_confirmacao = models.CharField(max_length=100, blank=True, null=True)
+    codigo_confirmacao = models.CharField(max_length=100, blank=True, null=True, db_index=True)
 
     class Meta:
         db_table = 'usuario'